@@ -0,0 +1,151 @@
+import numpy as np
+import heapq
+import itertools
+import time
+from astar import AStar
+from consts import Consts
+
+# Anytime Repairing A* (ARA*): a series of weighted A* searches (f = g + w*h) with a decreasing weight w.
+# The first searches find a solution fast, and every later one improves it. The searches share their work:
+# the open states and g-scores carry over, and the states that improved after they were closed (the INCONS
+# states) are reopened in the next search instead of starting over.
+# Every solution comes with a proven bound: its cost is at most `bound` times the optimal cost. The bound is
+# proven for consistent heuristics (for an inconsistent one it is an estimate).
+class AnytimeAStar(AStar):
+    initialWeight = None
+    weightDecrement = None
+    timeBudget = None
+    # The suboptimality bound of the last result of run()
+    bound = None
+
+    # timeBudget (in seconds) stops the search with the best solution found so far. None to search until optimal
+    def __init__(self, heuristic, cost=None, initialWeight=Consts.ANYTIME_INITIAL_WEIGHT,
+                 weightDecrement=Consts.ANYTIME_WEIGHT_DECREMENT, timeBudget=None, shouldCache=False, cache=None):
+        super().__init__(heuristic, cost, shouldCache, cache)
+        self.initialWeight = initialWeight
+        self.weightDecrement = weightDecrement
+        self.timeBudget = timeBudget
+
+    # Only optimal results are cached, but the weights change the developed count (the time budget only decides
+    # whether the result is cached at all)
+    def _engineKey(self):
+        return (type(self).__name__, float(self.initialWeight), float(self.weightDecrement))
+
+    # Returns the same tuple as AStar.run, for the best solution found within the time budget.
+    # Its bound is kept in self.bound (np.inf when no solution was found in time)
+    def run(self, problem):
+        if self.shouldCache:
+            res = self._getFromCache(problem)
+
+            if res is not None:
+                self.bound = 1.0
+                return res
+
+        res, self.bound = ([], -1, -1, 0), np.inf
+        for path, g, hI, developed, bound in self.iterSolutions(problem, self.timeBudget):
+            res, self.bound = (path, g, hI, developed), bound
+
+        # Only optimal results are cached, so the cache never returns a worse result than a full search
+        if self.bound == 1.0:
+            self._storeInCache(problem, res)
+
+        return res
+
+    # Yields (path, g, h(I), developed states so far, bound) whenever a search improves the solution or its bound,
+    # until the solution is proven optimal or the time budget (in seconds) runs out
+    def iterSolutions(self, problem, timeBudget=None):
+        if self._isUnreachable(problem):
+            return
+
+        deadline = None if timeBudget is None else time.time() + timeBudget
+        source = problem.initialState
+        hI = self.heuristic.estimate(problem, source)
+
+        g_score = {source: 0}
+        h_score = {source: hI}
+        parents = {}
+        closed_set = set()
+        incons_set = set()
+        open_heap = []
+        open_set = {}
+        tieBreaker = itertools.count()
+
+        goal, goal_g = (source, 0) if problem.isGoal(source) else (None, np.inf)
+        weight = max(self.initialWeight, 1.0)
+        self._pushOpenState(open_heap, open_set, source, weight * hI, hI, tieBreaker)
+
+        developed = 0
+        previousBound = np.inf
+
+        while True:
+            # Improve the path with the current weight
+            timedOut = False
+            while open_set and goal_g > self._peekLowest_f_score(open_heap, open_set):
+                if deadline is not None and time.time() > deadline:
+                    timedOut = True
+                    break
+
+                current = self._getOpenStateWithLowest_f_score(open_heap, open_set)
+                closed_set.add(current)
+                developed += 1
+
+                for successor, cost in problem.expandWithCosts(current, self.cost):
+                    new_g = g_score[current] + cost
+
+                    if new_g >= g_score.get(successor, np.inf):
+                        continue
+
+                    g_score[successor] = new_g
+                    parents[successor] = current
+
+                    if problem.isGoal(successor) and new_g < goal_g:
+                        goal, goal_g = successor, new_g
+
+                    if successor not in h_score:
+                        h_score[successor] = self.heuristic.estimate(problem, successor)
+
+                    # A closed state is not reopened within a search, only in the next one
+                    if successor in closed_set:
+                        incons_set.add(successor)
+                    else:
+                        h = h_score[successor]
+                        self._pushOpenState(open_heap, open_set, successor, new_g + weight * h, h, tieBreaker)
+
+            # No solution so far means there is none (or there was no time to find one)
+            if goal is None:
+                return
+
+            # The optimal cost is at least the lowest g + h of the states that are still to be developed.
+            # A finished search also proves its weight, and a cut one keeps the bound of the one before it
+            lowerBound = min([g_score[s] + h_score[s] for s in itertools.chain(open_set, incons_set)], default=np.inf)
+            searchBound = previousBound if timedOut else weight
+            if goal_g <= lowerBound:
+                bound = 1.0
+            else:
+                bound = max(min(searchBound, goal_g / lowerBound if lowerBound > 0 else np.inf), 1.0)
+
+            if bound < previousBound:
+                yield self._reconstructPath(parents, goal), goal_g, hI, developed, bound
+            previousBound = bound
+
+            if bound <= 1.0 or timedOut:
+                return
+
+            # The next search: a lower weight, and the improved closed states join the open ones
+            weight = max(weight - self.weightDecrement, 1.0)
+            for state in incons_set:
+                open_set[state] = None
+            incons_set.clear()
+            closed_set.clear()
+
+            open_heap.clear()
+            for state in list(open_set):
+                h = h_score[state]
+                self._pushOpenState(open_heap, open_set, state, g_score[state] + weight * h, h, tieBreaker)
+
+    # The lowest f-score in the open heap, dropping the stale entries on its top
+    def _peekLowest_f_score(self, open_heap, open_set):
+        while open_set.get(open_heap[0][-1]) is not open_heap[0]:
+            heapq.heappop(open_heap)
+
+        return open_heap[0][0]
@@ -1,4 +1,8 @@
 import numpy as np
+from consts import Consts
+from searchCache import LRUCache
+import heapq
+import itertools
 import sys
 
 class AStar:
@@ -7,33 +11,57 @@ class AStar:
     _cache = None
     shouldCache = None
 
-    def __init__(self, heuristic, cost=None, shouldCache=False):
+    # cache is a searchCache.SearchCache (e.g. a TieredCache with a disk tier). Giving one turns caching on;
+    # otherwise shouldCache uses a size-bounded in-memory LRU cache
+    def __init__(self, heuristic, cost=None, shouldCache=False, cache=None):
         self.heuristic = heuristic
-        self.shouldCache = shouldCache
+        self.shouldCache = shouldCache or cache is not None
         self.cost = cost
 
-        # Handles the cache. No reason to change this code.
+        # Handles the cache.
         if self.shouldCache:
-            self._cache = {}
-
-    # Get's from the cache. No reason to change this code.
+            self._cache = cache if cache is not None else LRUCache(Consts.ASTAR_CACHE_SIZE)
+
+    # The results depend on the problem, on the search engine, and on the cost and heuristic used (through h(I) and
+    # the developed count). Problems with a cacheKey() are keyed by it, so the key is also valid in other processes
+    # (for a disk cache). The cost and heuristic are keyed by their cacheKey(), which includes their parameters, and
+    # the engine by _engineKey(), so engines that share a cache never get each other's results
+    def _cacheKey(self, problem):
+        problemKey = problem.cacheKey() if hasattr(problem, 'cacheKey') else problem
+        costKey = self.cost.cacheKey() if self.cost is not None else None
+        return (problemKey, self._engineKey(), costKey, self.heuristic.cacheKey())
+
+    # The part of the cache keys that identifies the search engine: its class, and the parameters its results
+    # depend on. Engines with such parameters override it
+    def _engineKey(self):
+        return (type(self).__name__,)
+
+    # Get's from the cache.
     def _getFromCache(self, problem):
         if self.shouldCache:
-            return self._cache.get(problem)
+            return self._cache.get(self._cacheKey(problem))
 
         return None
 
-    # Get's from the cache. No reason to change this code.
+    # Stores in the cache.
     def _storeInCache(self, problem, value):
         if not self.shouldCache:
             return
 
-        self._cache[problem] = value
+        self._cache.put(self._cacheKey(problem), value)
+
+    # Problems that can tell there is no solution (see MapProblem.isUnreachable) fail before any search
+    @staticmethod
+    def _isUnreachable(problem):
+        return hasattr(problem, 'isUnreachable') and problem.isUnreachable()
+
+    # Returns the hit/miss/eviction counters of the cache
+    def cacheStats(self):
+        return self._cache.stats() if self.shouldCache else None
 
     # Run A*
     def run(self, problem):
         # Check if we already have this problem in the cache.
-        # No reason to change this code.
         source = problem.initialState
         if self.shouldCache:
             res = self._getFromCache(problem)
@@ -41,30 +69,71 @@ class AStar:
             if res is not None:
                 return res
 
-        # Initializes the required sets
-        closed_set = set()  # The set of nodes already evaluated.
+        if self._isUnreachable(problem):
+            return ([], -1, -1, 0)
+
         parents = {}  # The map of navigated nodes.
 
-        # Save the g_score and f_score for the open nodes
+        # Save the g_score and f_score for the open nodes.
+        # open_set maps every open state to its live heap entry; entries that were superseded by a better
+        # g_score stay in the heap and are skipped lazily when popped.
+        hI = self.heuristic.estimate(problem, problem.initialState)
         g_score = {source: 0}
-        open_set = {source: self.heuristic.estimate(problem, problem.initialState)}
+        open_heap = []
+        open_set = {}
+        tieBreaker = itertools.count()
+        self._pushOpenState(open_heap, open_set, source, hI, hI, tieBreaker)
 
         developed = 0
 
-        # TODO : Implement astar.
-        # Tips:
-        # - To get the successor states of a state with their costs, use: problem.expandWithCosts(state, self.cost)
-        # - You should break your code into methods (two such stubs are written below)
-        # - Don't forget to cache your result between returning it - TODO
+        while open_set:
+            current = self._getOpenStateWithLowest_f_score(open_heap, open_set)
+
+            if problem.isGoal(current):
+                res = (self._reconstructPath(parents, current), g_score[current], hI, developed)
+                self._storeInCache(problem, res)
+                return res
+
+            developed += 1
+
+            for successor, cost in problem.expandWithCosts(current, self.cost):
+                new_g = g_score[current] + cost
+
+                if new_g >= g_score.get(successor, np.inf):
+                    continue
+
+                # A better route was found - (re)open the successor
+                g_score[successor] = new_g
+                parents[successor] = current
+
+                h = self.heuristic.estimate(problem, successor)
+                self._pushOpenState(open_heap, open_set, successor, new_g + h, h, tieBreaker)
 
-        # TODO : VERY IMPORTANT: must return a tuple of (path, g_score(goal), h(I), developed)
         return ([], -1, -1, developed)
 
-    def _getOpenStateWithLowest_f_score(self, open_set):
-        # TODO : Implement
-        raise NotImplementedError
+    # Push a state to the open heap. Ties on f are broken by lower h (deeper states) and then by insertion order,
+    # so runs are deterministic regardless of how the states hash.
+    def _pushOpenState(self, open_heap, open_set, state, f, h, tieBreaker):
+        entry = (f, h, next(tieBreaker), state)
+        open_set[state] = entry
+        heapq.heappush(open_heap, entry)
+
+    # Pop the open state with the lowest f-score, skipping stale heap entries
+    def _getOpenStateWithLowest_f_score(self, open_heap, open_set):
+        while True:
+            entry = heapq.heappop(open_heap)
+            state = entry[-1]
+
+            if open_set.get(state) is entry:
+                del open_set[state]
+                return state
 
     # Reconstruct the path from a given goal by its parent and so on
-    def _reconstructPath(self, parents:list, goal):
-        # TODO : Implement
-        raise NotImplementedError
+    def _reconstructPath(self, parents:dict, goal):
+        path = [goal]
+
+        while path[-1] in parents:
+            path.append(parents[path[-1]])
+
+        path.reverse()
+        return path
@@ -0,0 +1,103 @@
+import numpy as np
+import heapq
+import itertools
+from astar import AStar
+
+# Bidirectional A* for point-to-point MapProblems.
+# A forward search from the source and a backward search (over the reverse links) from the target run in turns.
+# Both use the average potential p(v) = (h_t(v) - h_s(v)) / 2, where h_t estimates the distance from v to the
+# target and h_s the distance from the source to v, so the reduced link costs are the same in both directions.
+# With a consistent heuristic the best meeting point found is optimal once the two lowest keys sum up to it.
+class BidirectionalAStar(AStar):
+    # Run bidirectional A*. Returns the same tuple as AStar.run, counting the states developed in both directions
+    def run(self, problem):
+        # Check if we already have this problem in the cache.
+        if self.shouldCache:
+            res = self._getFromCache(problem)
+
+            if res is not None:
+                return res
+
+        if self._isUnreachable(problem):
+            return ([], -1, -1, 0)
+
+        hI = self.heuristic.estimate(problem, problem.initialState)
+        reverseProblem = problem.reversed()
+
+        forward = _Frontier(problem, lambda s: self._potential(problem, reverseProblem, s))
+        backward = _Frontier(reverseProblem, lambda s: -self._potential(problem, reverseProblem, s))
+
+        # The shortest path found so far goes through meetingState and its length is mu
+        mu = np.inf
+        meetingState = None
+        if problem.isGoal(problem.initialState):
+            mu, meetingState = 0, problem.initialState
+
+        developed = 0
+
+        while forward.open_set and backward.open_set:
+            forwardKey = self._getLowest_f_score(forward)
+            backwardKey = self._getLowest_f_score(backward)
+            if forwardKey + backwardKey >= mu:
+                break
+
+            # Develop the direction whose best key is lower
+            frontier, other = (forward, backward) if forwardKey <= backwardKey else (backward, forward)
+
+            current = self._getOpenStateWithLowest_f_score(frontier.open_heap, frontier.open_set)
+            developed += 1
+
+            for successor, cost in frontier.problem.expandWithCosts(current, self.cost):
+                new_g = frontier.g_score[current] + cost
+
+                if new_g >= frontier.g_score.get(successor, np.inf):
+                    continue
+
+                frontier.g_score[successor] = new_g
+                frontier.parents[successor] = current
+
+                p = frontier.potential(successor)
+                self._pushOpenState(frontier.open_heap, frontier.open_set, successor, new_g + p, p,
+                                    frontier.tieBreaker)
+
+                if successor in other.g_score and new_g + other.g_score[successor] < mu:
+                    mu = new_g + other.g_score[successor]
+                    meetingState = successor
+
+        if meetingState is None:
+            return ([], -1, -1, developed)
+
+        path = self._reconstructPath(forward.parents, meetingState) + \
+               self._reconstructPath(backward.parents, meetingState)[-2::-1]
+        res = (path, mu, hI, developed)
+        self._storeInCache(problem, res)
+        return res
+
+    def _potential(self, problem, reverseProblem, state):
+        return (self.heuristic.estimate(problem, state) - self.heuristic.estimate(reverseProblem, state)) / 2
+
+    # Get the lowest key of the open states of a frontier (np.inf if there are none), dropping stale heap entries
+    def _getLowest_f_score(self, frontier):
+        open_heap = frontier.open_heap
+
+        while open_heap and frontier.open_set.get(open_heap[0][-1]) is not open_heap[0]:
+            heapq.heappop(open_heap)
+
+        return open_heap[0][0] if open_heap else np.inf
+
+
+# The state of the search in one direction
+class _Frontier:
+    def __init__(self, problem, potential):
+        self.problem = problem
+        self.potential = potential
+        self.g_score = {problem.initialState: 0}
+        self.parents = {}
+        self.open_heap = []
+        self.open_set = {}
+        self.tieBreaker = itertools.count()
+
+        p = potential(problem.initialState)
+        entry = (p, p, next(self.tieBreaker), problem.initialState)
+        self.open_set[problem.initialState] = entry
+        self.open_heap.append(entry)
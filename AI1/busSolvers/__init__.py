@@ -1,4 +1,5 @@
 from .busSolver import BusSolver
 from .greedySolver import GreedySolver
 from .greedyBestFirstSolver import GreedyBestFirstSolver
-from .greedyStochasticSolver import GreedyStochasticSolver
\ No newline at end of file
+from .greedyStochasticSolver import GreedyStochasticSolver
+from .stochasticRestarts import StochasticRestartRunner
@@ -1,4 +1,5 @@
 import abc
+import numpy as np
 from problems import MapProblem
 
 class BusSolver(metaclass=abc.ABCMeta):
@@ -16,18 +17,20 @@ class BusSolver(metaclass=abc.ABCMeta):
 
     # Solve the bus problem. Return the picking path
     def solve(self, problem):
-        pickingOrder = self._findPickingOrder(problem)
+        return self.plan(problem).toPath()
 
-        pickingPath = [problem.initialState.junctionIdx]
+    # Solve the bus problem without building the picking path: returns a PickingPlan with the picking order and
+    # the distance and junctions of every leg, from one A* run per leg. Its path is built only if it is needed.
+    # A leg with no path gets the distance np.inf (and no junctions), so the plan is never scored below a real one
+    def plan(self, problem):
+        pickingOrder = self._findPickingOrder(problem)
 
-        # Build the picking path itself using A* between every two locations in the picking order
+        legDistances = []
+        legJunctions = []
         for source, target in zip(pickingOrder[:-1], pickingOrder[1:]):
-            mapSubProblem = MapProblem(self.roads, source, target)
-            statesSubpath = self.astar.run(mapSubProblem)[0]
-
-            delta = [s.junctionIdx for s in statesSubpath[1:]]
-
-            pickingPath = pickingPath + delta
+            states, distance, _, _ = self.astar.run(MapProblem(self.roads, source, target))
+            legDistances.append(np.inf if distance == -1 else distance)
+            legJunctions.append([s.junctionIdx for s in states])
 
-        from path import Path
-        return Path(self.roads, pickingPath)
\ No newline at end of file
+        from path import PickingPlan
+        return PickingPlan(self.roads, pickingOrder, legDistances, legJunctions)
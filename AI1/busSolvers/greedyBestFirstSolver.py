@@ -9,8 +9,11 @@ class GreedyBestFirstSolver(GreedySolver):
     def _getNextState(self, problem, currState):
         successors = list(problem.expand(currState))
 
-        # TODO : Return the next state
-        raise NotImplementedError
+        scores = self._scorer.computeMany(currState, successors)
+        bestIdx = np.argmin(scores)
+
+        # Costs are np.inf when there is no path (e.g. ActualDistanceCost), and argmin would pick the first successor
+        if np.isinf(scores[bestIdx]):
+            raise ValueError("No reachable successor from junction {}".format(currState.junctionIdx))
 
-        bestIdx = None
         return successors[bestIdx]
@@ -14,18 +14,30 @@ class GreedyStochasticSolver(GreedySolver):
         self._N = topNumToConsider
 
     def _getSuccessorsProbabilities(self, currState, successors):
-        # Get the scores
-        X = np.array([self._scorer.compute(currState, target) for target in successors])
+        # Get the scores (all of them in one call)
+        X = self._scorer.computeMany(currState, successors)
 
         # Initialize an all-zeros vector for the distribution
         P = np.zeros((len(successors),))
 
-        # TODO: Fill the distribution in P as explained in the instructions.
-        # TODO : No changes in the rest of the code are needed
-        raise NotImplementedError
+        # Only the N best (lowest) scores get a probability: P(x) ~ (x / alpha)^(-1/T), alpha being the lowest score
+        best = np.argsort(X, kind='stable')[:self._N]
+        alpha = X[best[0]]
+
+        if np.isinf(alpha):
+            raise ValueError("No reachable successor from junction {}".format(currState.junctionIdx))
+
+        if alpha == 0:
+            # Successors at no distance at all are always preferred
+            best = best[X[best] == 0]
+            P[best] = 1
+        else:
+            P[best] = (X[best] / alpha) ** (-1 / self.T)
+
+        P /= P.sum()
 
         # Update the temperature
-        self.T *= self._TEMERATURE_DECAY_FACTOR
+        self.T *= self._TEMPERATURE_DECAY_FACTOR
 
         return P
 
@@ -34,13 +46,12 @@ class GreedyStochasticSolver(GreedySolver):
         successors = list(problem.expand(currState))
         P = self._getSuccessorsProbabilities(currState, successors)
 
-        # TODO : Choose the next state stochastically according to the calculated distribution.
-        # You should look for a suitable function in numpy.random.
-        nextIdx = None
+        # Choose the next state stochastically according to the calculated distribution
+        nextIdx = np.random.choice(len(successors), p=P)
 
         return successors[nextIdx]
 
-    # Override the base solve method to initialize the temperature
-    def solve(self, initialState):
+    # Override the base method to initialize the temperature (for both solve and plan)
+    def _findPickingOrder(self, problem):
         self.T = self._INITIAL_TEMPERATURE
-        return super().solve(initialState)
\ No newline at end of file
+        return super()._findPickingOrder(problem)
\ No newline at end of file
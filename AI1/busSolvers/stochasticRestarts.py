@@ -0,0 +1,85 @@
+from consts import Consts
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import time
+
+# Runs independent restarts of a stochastic solver (e.g. GreedyStochasticSolver), on a process pool when
+# workers > 1. Restart i always runs with the seed Consts.setSeed(i + 1), so the results do not depend on
+# the number of workers or on which worker ran it.
+# The run stops early after timeBudget seconds, or after patience restarts in a row did not improve the best result.
+class StochasticRestartRunner:
+    solver = None
+    workers = None
+    timeBudget = None
+    patience = None
+
+    def __init__(self, solver, workers=1, timeBudget=None, patience=None):
+        self.solver = solver
+        self.workers = workers
+        self.timeBudget = timeBudget
+        self.patience = patience
+
+    # Yields (restart index, picking path distance) for every restart as soon as it is done
+    def iterResults(self, problem, restarts):
+        start = time.time()
+        best = np.inf
+        sinceImprovement = 0
+
+        for restartIdx, distance in self._iterRestarts(problem, restarts):
+            yield restartIdx, distance
+
+            if distance < best:
+                best, sinceImprovement = distance, 0
+            else:
+                sinceImprovement += 1
+
+            if (self.timeBudget is not None and time.time() - start >= self.timeBudget) or \
+                    (self.patience is not None and sinceImprovement >= self.patience):
+                return
+
+    # Returns the best distance, the indices of the restarts that ran (sorted) and their distances.
+    # When the run stops early on a pool, the restarts that ran are not always the first ones, so a distance is
+    # identified by its restart index (restart i ran with the seed i + 1), not by its position.
+    # With no restarts the best distance is np.inf and the arrays are empty
+    def run(self, problem, restarts):
+        results = sorted(self.iterResults(problem, restarts))
+        restartIndices = np.array([restartIdx for restartIdx, _ in results], dtype=np.int64)
+        distances = np.array([distance for _, distance in results], dtype=float)
+        return (distances.min() if len(distances) else np.inf), restartIndices, distances
+
+    def _iterRestarts(self, problem, restarts):
+        if self.workers <= 1:
+            for restartIdx in range(restarts):
+                yield _solveWith(self.solver, problem, restartIdx)
+            return
+
+        executor = ProcessPoolExecutor(self.workers, initializer=_initWorker, initargs=(self.solver, problem))
+        futures = [executor.submit(_runRestart, restartIdx) for restartIdx in range(restarts)]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Stopping early (or the consumer stopping) cancels the restarts that did not start yet
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+
+# The solver and problem of the current worker process
+_workerSolver = None
+_workerProblem = None
+
+
+def _initWorker(solver, problem):
+    global _workerSolver, _workerProblem
+    _workerSolver, _workerProblem = solver, problem
+
+
+def _runRestart(restartIdx):
+    return _solveWith(_workerSolver, _workerProblem, restartIdx)
+
+
+def _solveWith(solver, problem, restartIdx):
+    Consts.setSeed(restartIdx + 1)
+    # Only the distance is needed, so the picking path is not built
+    return restartIdx, solver.plan(problem).getDistance()
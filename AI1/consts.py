@@ -7,12 +7,25 @@ class Consts:
 
     DATA_PATH = "../db/"
 
+    # Entries kept in the in-memory cache of AStar
+    ASTAR_CACHE_SIZE = 100000
+
+    # The weight of the first search of AnytimeAStar, and how much every later search lowers it (down to 1)
+    ANYTIME_INITIAL_WEIGHT = 3.0
+    ANYTIME_WEIGHT_DECREMENT = 0.5
+
+    # States kept in the transposition table of IDAStar
+    IDASTAR_TABLE_SIZE = 1000000
+
     @staticmethod
     def getDataFilePath(fileName):
         return Consts.DATA_PATH + ("/" if Consts.DATA_PATH[-1] != "/" else "") + fileName
 
+    SEED = 236501
+
+    # offset gives independent but reproducible streams, e.g. one per restart of a stochastic solver
     @staticmethod
-    def setSeed():
-        np.random.seed(236501)
+    def setSeed(offset=0):
+        np.random.seed(Consts.SEED + offset)
 
 Consts.setSeed()
\ No newline at end of file
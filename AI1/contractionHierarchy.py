@@ -0,0 +1,316 @@
+import numpy as np
+import heapq
+import os
+from states import MapState
+from ways.compact import as_compact
+
+# Contraction Hierarchies for point-to-point queries on a fixed map.
+# The preprocessing contracts the junctions one by one (least important first), adding a shortcut u->w for every
+# shortest path u->v->w that would be lost with v. A query is then a bidirectional Dijkstra that only climbs to
+# more important junctions, and the shortcuts on the result are unpacked back into links.
+# run(problem) returns the same tuple as AStar.run, so it can be passed to BusSolver and ActualDistanceCost
+# in place of an AStar object.
+class ContractionHierarchy:
+    # Witness searches stop after settling this many junctions. Lower values preprocess faster but add more shortcuts
+    WITNESS_SETTLED_LIMIT = 100
+
+    roads = None
+    _compact = None
+    rank = None
+
+    # The upward graph: for every junction, the edges to more important junctions
+    # The downward graph: for every junction, the edges from more important junctions
+    # middle is the junction a shortcut skips (its position), or -1 for a link of the map
+    def __init__(self, roads, rank, upOffsets, upTargets, upWeights, upMiddles,
+                 downOffsets, downSources, downWeights, downMiddles):
+        self.roads = roads
+        self._compact = as_compact(roads)
+        self.rank = rank
+        self._up = (upOffsets, upTargets, upWeights, upMiddles)
+        self._down = (downOffsets, downSources, downWeights, downMiddles)
+
+    @classmethod
+    def build(cls, roads):
+        compact = as_compact(roads)
+        n = len(compact.ids)
+
+        # The remaining graph, with the shortest of every group of parallel links
+        out = [{} for _ in range(n)]
+        inc = [{} for _ in range(n)]
+        sources = np.repeat(np.arange(n), np.diff(compact.offsets)).tolist()
+        for u, w, d in zip(sources, compact.target_positions.tolist(), compact.distances.tolist()):
+            if u != w and d < out[u].get(w, np.inf):
+                out[u][w] = d
+                inc[w][u] = d
+
+        middle = {}
+        deletedNeighbours = [0] * n
+        rank = np.zeros(n, dtype=np.int64)
+        upward = [None] * n
+        downward = [None] * n
+
+        heap = [(cls._priority(out, inc, deletedNeighbours, v, cls._findShortcuts(out, inc, v)), v) for v in range(n)]
+        heapq.heapify(heap)
+
+        contractedNum = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+
+            # Lazy update: the priority may have grown since it was pushed
+            shortcuts = cls._findShortcuts(out, inc, v)
+            priority = cls._priority(out, inc, deletedNeighbours, v, shortcuts)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, v))
+                continue
+
+            upward[v] = [(w, d, middle.pop((v, w), -1)) for w, d in out[v].items()]
+            downward[v] = [(u, d, middle.pop((u, v), -1)) for u, d in inc[v].items()]
+
+            for w in out[v]:
+                del inc[w][v]
+                deletedNeighbours[w] += 1
+            for u in inc[v]:
+                del out[u][v]
+                deletedNeighbours[u] += 1
+            out[v], inc[v] = {}, {}
+
+            for u, w, d in shortcuts:
+                if d < out[u].get(w, np.inf):
+                    out[u][w] = d
+                    inc[w][u] = d
+                    middle[(u, w)] = v
+
+            rank[v] = contractedNum
+            contractedNum += 1
+
+        return cls(roads, rank, *cls._toArrays(upward), *cls._toArrays(downward))
+
+    # Edge difference: shortcuts added minus edges removed, plus a term that spreads the contraction over the map
+    @staticmethod
+    def _priority(out, inc, deletedNeighbours, v, shortcuts):
+        return len(shortcuts) - len(out[v]) - len(inc[v]) + deletedNeighbours[v]
+
+    # Find the shortcuts needed when contracting v: u->v->w is needed unless a witness path u->w avoids v
+    @classmethod
+    def _findShortcuts(cls, out, inc, v):
+        shortcuts = []
+
+        for u, du in inc[v].items():
+            targets = [(w, du + dw) for w, dw in out[v].items() if w != u]
+            if not targets:
+                continue
+
+            witness = cls._witnessDistances(out, u, v, {w for w, _ in targets}, max(d for _, d in targets))
+            shortcuts.extend((u, w, d) for w, d in targets if witness.get(w, np.inf) > d)
+
+        return shortcuts
+
+    # A Dijkstra from source which ignores the excluded junction,
+    # and stops when all the targets are settled or beyond maxCost
+    @classmethod
+    def _witnessDistances(cls, out, source, excluded, targets, maxCost):
+        dist = {source: 0}
+        heap = [(0, source)]
+        settled = 0
+        pending = len(targets)
+        inf = np.inf
+
+        while heap:
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+            if d > maxCost or settled >= cls.WITNESS_SETTLED_LIMIT:
+                break
+            settled += 1
+
+            if x in targets:
+                pending -= 1
+                if pending == 0:
+                    break
+
+            for y, l in out[x].items():
+                if y != excluded and d + l < dist.get(y, inf):
+                    dist[y] = d + l
+                    heapq.heappush(heap, (d + l, y))
+
+        return dist
+
+    @staticmethod
+    def _toArrays(edgeLists):
+        offsets = np.zeros(len(edgeLists) + 1, dtype=np.int64)
+        np.cumsum([len(edges) for edges in edgeLists], out=offsets[1:])
+        edges = [e for edges in edgeLists for e in edges]
+        return (offsets,
+                np.array([e[0] for e in edges], dtype=np.int32),
+                np.array([e[1] for e in edges], dtype=np.float64),
+                np.array([e[2] for e in edges], dtype=np.int32))
+
+    _ARRAY_NAMES = ['upOffsets', 'upTargets', 'upWeights', 'upMiddles',
+                    'downOffsets', 'downSources', 'downWeights', 'downMiddles']
+
+    # The file keeps the fingerprint of the map (its junctions and link distances), so a hierarchy is never loaded
+    # for other link weights, where its shortcuts would give wrong shortest paths
+    def save(self, filePath):
+        np.savez(filePath, fingerprint=self._compact.fingerprint(), rank=self.rank,
+                 **dict(zip(self._ARRAY_NAMES, self._up + self._down)))
+
+    @classmethod
+    def load(cls, roads, filePath):
+        with np.load(filePath) as arrays:
+            if 'fingerprint' not in arrays.files or str(arrays['fingerprint']) != as_compact(roads).fingerprint():
+                raise ValueError("{} was built for a different map or different link weights".format(filePath))
+
+            return cls(roads, arrays['rank'], *[arrays[name] for name in cls._ARRAY_NAMES])
+
+    # Load the hierarchy from filePath, or build it and save it there
+    @classmethod
+    def loadOrBuild(cls, roads, filePath):
+        if os.path.exists(filePath):
+            try:
+                return cls.load(roads, filePath)
+            except ValueError:
+                pass
+
+        ch = cls.build(roads)
+        ch.save(filePath)
+        return ch
+
+    @staticmethod
+    def _edges(graph, pos):
+        offsets, others, weights, middles = graph
+        start, end = offsets[pos], offsets[pos + 1]
+        return zip(others[start:end].tolist(), weights[start:end].tolist())
+
+    # Returns (distance, list of junction positions, settled junctions). The distance is np.inf if there is no path
+    def query(self, source, target):
+        if source == target:
+            return 0, [source], 0
+
+        # One search climbs the upward graph from the source, the other the downward graph (backwards) from the target
+        searches = [({source: 0}, {}, [(0, source)], self._up, self._down),
+                    ({target: 0}, {}, [(0, target)], self._down, self._up)]
+        best = np.inf
+        meeting = None
+        settled = 0
+
+        while True:
+            live = [s for s in searches if s[2] and s[2][0][0] < best]
+            if not live:
+                break
+
+            dist, parents, heap, graph, reverseGraph = min(live, key=lambda s: s[2][0][0])
+            otherDist = searches[1][0] if dist is searches[0][0] else searches[0][0]
+
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+            settled += 1
+
+            if x in otherDist and d + otherDist[x] < best:
+                best = d + otherDist[x]
+                meeting = x
+
+            # Stall-on-demand: x is not on a shortest path if a more important junction reaches it for less
+            if any(y in dist and dist[y] + l < d for y, l in self._edges(reverseGraph, x)):
+                continue
+
+            for y, l in self._edges(graph, x):
+                if d + l < dist.get(y, np.inf):
+                    dist[y] = d + l
+                    parents[y] = x
+                    heapq.heappush(heap, (d + l, y))
+
+        if meeting is None:
+            return np.inf, [], settled
+
+        forwardParents, backwardParents = searches[0][1], searches[1][1]
+        path = [meeting]
+        while path[-1] in forwardParents:
+            path.append(forwardParents[path[-1]])
+        path.reverse()
+        while path[-1] in backwardParents:
+            path.append(backwardParents[path[-1]])
+
+        return best, self._unpack(path), settled
+
+    # Returns the distances from every one of sources to every one of targets (positions), np.inf if unreachable.
+    # Bucket based: the backward search space of every target is stored in buckets at the junctions it settles,
+    # and the forward search from every source then only scans the buckets of the junctions it settles.
+    def manyToMany(self, sources, targets):
+        buckets = {}
+        for j, t in enumerate(targets):
+            for v, d in self._searchSpace(t, self._down, self._up):
+                buckets.setdefault(v, []).append((j, d))
+
+        matrix = np.full((len(sources), len(targets)), np.inf)
+        for i, s in enumerate(sources):
+            row = [np.inf] * len(targets)
+            for v, d in self._searchSpace(s, self._up, self._down):
+                for j, bucketDistance in buckets.get(v, ()):
+                    if d + bucketDistance < row[j]:
+                        row[j] = d + bucketDistance
+            matrix[i] = row
+
+        return matrix
+
+    # A full Dijkstra over one direction of the hierarchy. Returns (position, distance) of the junctions it settles
+    def _searchSpace(self, source, graph, reverseGraph):
+        dist = {source: 0}
+        heap = [(0, source)]
+        space = []
+
+        while heap:
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+
+            if any(y in dist and dist[y] + l < d for y, l in self._edges(reverseGraph, x)):
+                continue
+            space.append((x, d))
+
+            for y, l in self._edges(graph, x):
+                if d + l < dist.get(y, np.inf):
+                    dist[y] = d + l
+                    heapq.heappush(heap, (d + l, y))
+
+        return space
+
+    # The junction skipped by the edge a->b (-1 if it is a link of the map)
+    def _middle(self, a, b):
+        if self.rank[a] < self.rank[b]:
+            (offsets, others, _, middles), pos, other = self._up, a, b
+        else:
+            (offsets, others, _, middles), pos, other = self._down, b, a
+
+        start, end = offsets[pos], offsets[pos + 1]
+        return int(middles[start + others[start:end].tolist().index(other)])
+
+    # Replace the shortcuts on a path by the links they stand for
+    def _unpack(self, path):
+        unpacked = [path[0]]
+        stack = list(zip(path[:-1], path[1:]))[::-1]
+
+        while stack:
+            a, b = stack.pop()
+            m = self._middle(a, b)
+            if m == -1:
+                unpacked.append(b)
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+
+        return unpacked
+
+    # Solve a MapProblem. Returns the same tuple as AStar.run (there is no heuristic, so h(I) is 0)
+    def run(self, problem):
+        if problem.isUnreachable():
+            return ([], -1, -1, 0)
+
+        compact = self._compact
+        distance, positions, developed = self.query(compact.position(problem.initialState.junctionIdx),
+                                                    compact.position(problem.target.junctionIdx))
+        if not positions:
+            return ([], -1, -1, developed)
+
+        junctions = compact.ids[positions].tolist()
+        return ([MapState(j, self.roads[j].coordinates) for j in junctions], distance, 0, developed)
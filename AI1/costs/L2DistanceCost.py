@@ -1,4 +1,5 @@
 from . import Cost
+from ways.distance import distance, distances_from, distance_matrix
 
 class L2DistanceCost(Cost):
     roads = None
@@ -11,5 +12,13 @@ class L2DistanceCost(Cost):
         coord1 = self.roads[fromState.junctionIdx].coordinates
         coord2 = self.roads[toState.junctionIdx].coordinates
 
-        # TODO : Return the correct value (call the suitable function from ways.tools)
-        raise NotImplementedError
\ No newline at end of file
+        return distance(coord1, coord2)
+
+    # All the distances in one vectorized call
+    def computeMany(self, fromState, toStates):
+        coordinates = [self.roads[s.junctionIdx].coordinates for s in toStates]
+        return distances_from(self.roads[fromState.junctionIdx].coordinates, coordinates)
+
+    def computeMatrix(self, states, targets=None):
+        return distance_matrix([self.roads[s.junctionIdx].coordinates for s in states],
+                               None if targets is None else [self.roads[s.junctionIdx].coordinates for s in targets])
@@ -1,3 +1,5 @@
 'lists the functions you will need and what you can import with "from ways import"'
 from .cost import Cost
-from .L2DistanceCost import L2DistanceCost
\ No newline at end of file
+from .L2DistanceCost import L2DistanceCost
+from .distanceMatrix import DistanceMatrix
+from .travelTimeCost import TravelTimeCost
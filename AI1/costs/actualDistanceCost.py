@@ -1,17 +1,88 @@
 from . import Cost
 from ways.tools import compute_distance
+from ways.compact import as_compact
+from ways.algorithms import distances_to_targets, unreachable_pairs
+from ways.storage import init_worker, worker_roads
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 class ActualDistanceCost(Cost):
     roads = None
     astar = None
+    workers = None
 
-    def __init__(self, roads, astar):
+    # workers is the number of processes computeMatrix shards its rows over
+    def __init__(self, roads, astar, workers=1):
         self.roads = roads
         self.astar = astar
+        self.workers = workers
 
+    # Pairs with no path between them cost np.inf, like in computeMatrix. On a map whose components are labeled
+    # (see ways.algorithms.is_unreachable) some of them are ruled out without a search
     def compute(self, fromState, toState):
         from problems import MapProblem
 
         mapSubProblem = MapProblem(self.roads, fromState.junctionIdx, toState.junctionIdx)
+        if mapSubProblem.isUnreachable():
+            return np.inf
+
         _, l, _, _ = self.astar.run(mapSubProblem)
-        return l
\ No newline at end of file
+        return np.inf if l == -1 else l
+
+    # Fills the whole matrix with one search per source instead of one per pair: a bucket based many-to-many query
+    # when the search engine is a contraction hierarchy, and a Dijkstra that stops at the last target otherwise.
+    # Unreachable pairs are np.inf, and the searches do not wait for the targets the components prove unreachable
+    # (on a map whose components are labeled)
+    def computeMatrix(self, states, targets=None):
+        compact = as_compact(self.roads)
+        positions = [compact.position(s.junctionIdx) for s in states]
+        targetPositions = positions if targets is None else [compact.position(s.junctionIdx) for s in targets]
+
+        if hasattr(self.astar, 'manyToMany'):
+            return self.astar.manyToMany(positions, targetPositions)
+
+        unreachable = unreachable_pairs(compact, positions, targetPositions)
+        if self.workers > 1 and len(positions) > 1:
+            rows = self._computeRowsInParallel(compact, positions, targetPositions, unreachable)
+        else:
+            rows = _computeRows(positions, targetPositions, compact, unreachable)
+
+        return np.array(rows, dtype=float).reshape(len(positions), len(targetPositions))
+
+    # One backward Dijkstra per target (over the reversed links), which stops at the last of the states, instead of
+    # one search per state. Unreachable pairs are np.inf, like in computeMatrix
+    def computeColumns(self, states, targets):
+        compact = as_compact(self.roads)
+        positions = [compact.position(s.junctionIdx) for s in states]
+        targetPositions = [compact.position(s.junctionIdx) for s in targets]
+
+        unreachable = unreachable_pairs(compact, positions, targetPositions).T
+        columns = _computeRows(targetPositions, positions, compact, unreachable, reverse=True)
+        return np.array(columns, dtype=float).reshape(len(targetPositions), len(positions)).T
+
+    # The rows are split into a few shards per worker, so a slow shard does not hold the others back.
+    # The workers get the map once, through the pool initializer (memory-mapped maps are shared, not copied)
+    def _computeRowsInParallel(self, compact, positions, targetPositions, unreachable):
+        shardsNum = min(len(positions), 4 * self.workers)
+        shards = [shard.tolist() for shard in np.array_split(positions, shardsNum)]
+        unreachableShards = np.array_split(unreachable, shardsNum)
+
+        with ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(compact,)) as executor:
+            return [row for rows in executor.map(_computeRows, shards, [targetPositions] * len(shards),
+                                                 [None] * len(shards), unreachableShards)
+                    for row in rows]
+
+
+# Computes the matrix rows of the given sources. Runs in the pool workers, so it has to be a module level function.
+# unreachable[i][j] marks the targets the search from sources[i] does not have to reach.
+# With reverse=True the rows are the distances from the targets to every one of sources (columns of the matrix)
+def _computeRows(sources, targets, roads=None, unreachable=None, reverse=False):
+    roads = roads if roads is not None else worker_roads()
+    rows = []
+
+    for i, source in enumerate(sources):
+        reachable = targets if unreachable is None else [t for t, u in zip(targets, unreachable[i]) if not u]
+        distances = distances_to_targets(roads, source, reachable, reverse)
+        rows.append([distances.get(t, np.inf) for t in targets])
+
+    return rows
@@ -1,7 +1,38 @@
 import abc
+import numpy as np
 
 class Cost(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def compute(self, source, target):
         raise NotImplementedError
 
+    # The part of the search cache keys that identifies the cost (see AStar._cacheKey): its class, and
+    # the parameters its costs depend on, as numbers and strings. Costs with parameters override it
+    def cacheKey(self):
+        return (type(self).__name__,)
+
+    # Returns the array of costs from one state to each of the given states.
+    # Costs that can compute them together (e.g. vectorized) should override this.
+    def computeMany(self, fromState, toStates):
+        return np.array([self.compute(fromState, toState) for toState in toStates], dtype=float)
+
+    # Returns the matrix of costs from every one of the given states to every one of targets (matrix[i,j] is from
+    # states[i] to targets[j]), or between every two of the given states when there are no targets.
+    # Costs that can share work between pairs should override this.
+    def computeMatrix(self, states, targets=None):
+        square = targets is None
+        targets = states if square else targets
+        matrix = np.zeros((len(states), len(targets)))
+
+        for i, source in enumerate(states):
+            for j, target in enumerate(targets):
+                if not (square and i == j):
+                    matrix[i, j] = self.compute(source, target)
+
+        return matrix
+
+    # Returns the same matrix as computeMatrix(states, targets), for many states and few targets (e.g. the costs from
+    # the junctions already in a DistanceMatrix to the ones added to it). Costs that search from every source should
+    # override this to search backwards from every target instead.
+    def computeColumns(self, states, targets):
+        return self.computeMatrix(states, targets)
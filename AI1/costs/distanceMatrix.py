@@ -0,0 +1,76 @@
+from . import Cost
+import numpy as np
+
+# A precomputed matrix of the costs between a set of junctions, used as a cost by itself.
+# The matrix is filled in bulk by metric.computeMatrix, and compute() is then a lookup.
+# More junctions can be added later with extend(), which only computes the costs to and from the new junctions,
+# with searches from the new junctions only (forwards for the costs from them, backwards for the costs to them).
+class DistanceMatrix(Cost):
+    roads = None
+    metric = None
+    junctionIds = None
+    _junctionToMatIdx = None
+    # The matrix lives in the top left corner of a larger buffer, so extending it rarely has to copy it
+    _buffer = None
+
+    def __init__(self, roads, junctionIds, metric):
+        self.roads = roads
+        self.metric = metric
+        self.junctionIds = []
+        self._junctionToMatIdx = {}
+        self._buffer = np.zeros((0, 0))
+        self.extend(junctionIds)
+
+    # The matrix over the starting point and all the pickup and drop-off locations of a bus problem
+    @staticmethod
+    def forProblem(roads, problem, metric):
+        return DistanceMatrix(roads, [problem.initialState.junctionIdx] +
+                              [j for order in problem.orders for j in order], metric)
+
+    @property
+    def matrix(self):
+        n = len(self.junctionIds)
+        return self._buffer[:n, :n]
+
+    # Add junctions to the matrix. Returns the number of junctions that were not in it yet
+    def extend(self, junctionIds):
+        from states import MapState
+
+        oldNum = len(self.junctionIds)
+        newIds = [j for j in dict.fromkeys(junctionIds) if j not in self._junctionToMatIdx]
+        if not newIds:
+            return 0
+
+        oldStates = [MapState(j, self.roads[j].coordinates) for j in self.junctionIds]
+        newStates = [MapState(j, self.roads[j].coordinates) for j in newIds]
+        self.junctionIds.extend(newIds)
+        self._junctionToMatIdx.update((j, oldNum + i) for i, j in enumerate(newIds))
+
+        n = len(self.junctionIds)
+        if n > len(self._buffer):
+            buffer = np.zeros((max(n, 2 * len(self._buffer)),) * 2)
+            buffer[:oldNum, :oldNum] = self._buffer[:oldNum, :oldNum]
+            self._buffer = buffer
+
+        self._buffer[oldNum:n, oldNum:n] = self.metric.computeMatrix(newStates)
+        if oldNum > 0:
+            self._buffer[oldNum:n, :oldNum] = self.metric.computeMatrix(newStates, oldStates)
+            self._buffer[:oldNum, oldNum:n] = self.metric.computeColumns(oldStates, newStates)
+
+        return len(newIds)
+
+    def compute(self, fromState, toState):
+        return self._buffer[self._junctionToMatIdx[fromState.junctionIdx], self._junctionToMatIdx[toState.junctionIdx]]
+
+    def computeMany(self, fromState, toStates):
+        return self.distancesFrom(fromState.junctionIdx, [s.junctionIdx for s in toStates])
+
+    # The costs from one junction to each of the given junctions
+    def distancesFrom(self, junctionIdx, junctionIds):
+        return self._buffer[self._junctionToMatIdx[junctionIdx], [self._junctionToMatIdx[j] for j in junctionIds]]
+
+    def computeMatrix(self, states, targets=None):
+        indices = np.array([self._junctionToMatIdx[s.junctionIdx] for s in states], dtype=int)
+        targetIndices = indices if targets is None else \
+            np.array([self._junctionToMatIdx[s.junctionIdx] for s in targets], dtype=int)
+        return self._buffer[indices[:, None], targetIndices]
@@ -0,0 +1,25 @@
+from . import Cost
+from ways.traffic import travel_times
+import numpy as np
+
+# The time-dependent travel time (in minutes) of the link between two states, leaving fromState at fromState.time
+# (see ways.traffic). Without a time (a plain MapState) it leaves at departureMinute.
+class TravelTimeCost(Cost):
+    travelTimes = None
+    departureMinute = None
+
+    def __init__(self, roads, departureMinute=0):
+        self.travelTimes = travel_times(roads)
+        self.departureMinute = departureMinute
+
+    def cacheKey(self):
+        return super().cacheKey() + (self.departureMinute,)
+
+    def compute(self, fromState, toState):
+        return float(self.computeMany(fromState, [toState])[0])
+
+    # The links leaving one state, in one vectorized call
+    def computeMany(self, fromState, toStates):
+        linkIds = [self.travelTimes.link_id(fromState.junctionIdx, s.junctionIdx) for s in toStates]
+        departure = getattr(fromState, 'time', self.departureMinute)
+        return self.travelTimes.travel_time(np.array(linkIds, dtype=int), departure)
@@ -1,8 +1,8 @@
 from . import Heuristic
+from ways.distance import distance
 
 # Use the L2 aerial distance (in meters)
 class L2DistanceHeuristic(Heuristic):
     def estimate(self, problem, state):
-        # TODO : Return the correct distance
-        raise NotImplementedError
+        return distance(state.coordinates, problem.target.coordinates)
 
@@ -0,0 +1,93 @@
+from . import Heuristic
+import os
+import numpy as np
+from ways.compact import as_compact
+from ways.algorithms import shortest_distances
+
+# ALT (A*, Landmarks, Triangle inequality) heuristic for MapProblems.
+# For every landmark L, the exact distances from L and to L are precomputed once, and for any two junctions
+# d(v,t) >= d(L,t) - d(L,v) and d(v,t) >= d(v,L) - d(t,L). The estimate is the best of these bounds.
+class LandmarkHeuristic(Heuristic):
+    _roads = None
+    landmarks = None
+    _fromLandmarks = None
+    _toLandmarks = None
+
+    # If filePath is given the tables are loaded from it, or computed and saved there if it does not exist yet
+    # (or was saved for another map: the file keeps the fingerprint of the map, its junctions and link distances)
+    def __init__(self, roads, landmarksNum=8, filePath=None):
+        super().__init__()
+        self._roads = as_compact(roads)
+
+        if filePath is not None and self._load(filePath, landmarksNum):
+            return
+
+        self._selectLandmarks(landmarksNum)
+
+        if filePath is not None:
+            np.savez(filePath, fingerprint=self._roads.fingerprint(), landmarks=self.landmarks,
+                     fromLandmarks=self._fromLandmarks, toLandmarks=self._toLandmarks)
+
+    def _load(self, filePath, landmarksNum):
+        if not os.path.exists(filePath):
+            return False
+
+        # Tables of another map (or of other link distances) would make the heuristic inadmissible
+        with np.load(filePath) as tables:
+            if 'fingerprint' not in tables.files or str(tables['fingerprint']) != self._roads.fingerprint() or \
+                    len(tables['landmarks']) != landmarksNum:
+                return False
+
+            self.landmarks = tables['landmarks']
+            self._fromLandmarks = tables['fromLandmarks']
+            self._toLandmarks = tables['toLandmarks']
+
+        return True
+
+    # Farthest landmark selection: every new landmark is the junction farthest from the ones chosen so far
+    def _selectLandmarks(self, landmarksNum):
+        n = len(self._roads.ids)
+        landmarks = []
+        fromLandmarks = np.zeros((landmarksNum, n))
+        toLandmarks = np.zeros((landmarksNum, n))
+
+        # Start from the junction farthest from an arbitrary one
+        minDistance = shortest_distances(self._roads, [0])[0]
+
+        for i in range(landmarksNum):
+            reachable = np.isfinite(minDistance)
+            landmark = int(np.argmax(np.where(reachable, minDistance, -1)))
+            landmarks.append(landmark)
+
+            fromLandmarks[i] = shortest_distances(self._roads, [landmark])[0]
+            toLandmarks[i] = shortest_distances(self._roads, [landmark], reverse=True)[0]
+
+            minDistance = fromLandmarks[i] if i == 0 else np.minimum(minDistance, fromLandmarks[i])
+
+        self.landmarks = np.array(landmarks)
+        # Keep the distances of each junction together, so an estimate reads two rows
+        self._fromLandmarks = np.ascontiguousarray(fromLandmarks.T)
+        self._toLandmarks = np.ascontiguousarray(toLandmarks.T)
+
+    # The estimates depend on the landmarks (and on the map, which the problem keys already identify)
+    def cacheKey(self):
+        return super().cacheKey() + (len(self.landmarks),) + tuple(int(l) for l in self.landmarks)
+
+    # Lower bound on the distance from junction position a to junction position b
+    def _lowerBound(self, a, b):
+        with np.errstate(invalid='ignore'):
+            bounds = np.concatenate((self._fromLandmarks[b] - self._fromLandmarks[a],
+                                     self._toLandmarks[a] - self._toLandmarks[b]))
+
+        # fmax skips the undefined (inf - inf) bounds
+        return float(np.fmax.reduce(bounds, initial=0.0))
+
+    def estimate(self, problem, state):
+        statePos = self._roads.position(state.junctionIdx)
+        targetPos = self._roads.position(problem.target.junctionIdx)
+
+        # A reversed problem searches from the target back, so it needs the distance from its target to the state
+        if problem.isReversed:
+            return self._lowerBound(targetPos, statePos)
+
+        return self._lowerBound(statePos, targetPos)
@@ -1,58 +1,92 @@
 from heuristics import Heuristic
+from costs import DistanceMatrix
 import numpy as np
-from scipy.sparse.csgraph import minimum_spanning_tree
-from scipy.spatial.distance import pdist, squareform
-from ways.tools import compute_distance
 
-# An MST is a lower bound for a TSP result
+# An MST is a lower bound for a TSP result.
+# The rest of the route starts with an edge from the current location to one of the remaining locations,
+# and then visits all of them, so it costs at least the cheapest such edge plus the MST of the remaining locations.
+# The MST only depends on which orders remain, so it is computed once per (waiting, on bus) pair of masks,
+# and the states that differ only in their location share it.
 class MSTHeuristic(Heuristic):
     _distMat = None
     _junctionToMatIdx = None
+    _orderTable = None
+    _pickupIdx = None
+    _dropoffIdx = None
+    _memo = None
 
+    # metric is the cost between locations. It may also be a ready DistanceMatrix
     def __init__(self, roads, initialState, metric):
         super().__init__()
-        locations = [initialState.junctionIdx] + [o[0] for o in initialState.waitingOrders] + \
-                    [o[1] for o in initialState.waitingOrders]
+        self._orderTable = initialState.orderTable
 
-        self._initDistanceMatrix(roads, locations, metric)
+        if isinstance(metric, DistanceMatrix):
+            distances = metric
+        else:
+            print("MST heuristic is computing required metadata...")
+            distances = DistanceMatrix(roads, [initialState.junctionIdx] +
+                                       [j for order in self._orderTable.orders for j in order], metric)
 
-    def _initDistanceMatrix(self, roads, locations, metric):
-        junctionIds = list(set(locations))
+        # The tree is undirected, so every pair is connected by the cheaper of its two directions
+        self._distMat = np.minimum(distances.matrix, distances.matrix.T)
+        self._junctionToMatIdx = distances._junctionToMatIdx
+        self._pickupIdx = [self._junctionToMatIdx[o[0]] for o in self._orderTable.orders]
+        self._dropoffIdx = [self._junctionToMatIdx[o[1]] for o in self._orderTable.orders]
+        self._memo = {}
 
-        self._junctionToMatIdx = {j: i for i,j in enumerate(junctionIds)}
+    def estimate(self, problem, state):
+        if state.orderTable is self._orderTable:
+            key = (state.waitingMask, state.onBusMask)
+        else:
+            key = (self._orderTable.encode(state.waitingOrders), self._orderTable.encode(state.ordersOnBus))
 
-        pointsMat = np.zeros((2, len(junctionIds)))
+        if key not in self._memo:
+            self._memo[key] = self._remainingTree(*key)
+        weight, remaining = self._memo[key]
 
-        pointsMat[0, :] = [roads[p].lat for p in junctionIds]
-        pointsMat[1, :] = [roads[p].lon for p in junctionIds]
+        if len(remaining) == 0:
+            return 0
 
-        print("MST heuristic is computing required metadata...")
+        return weight + self._distMat[self._junctionToMatIdx[state.junctionIdx], remaining].min()
 
-        self._distMat = np.zeros((len(junctionIds), len(junctionIds)))
-        from states import MapState
-        for i in range(len(junctionIds)):
-            for j in range(len(junctionIds)):
-                if i == j:
-                    continue
+    # Returns the MST weight and the matrix indices of the locations the bus still has to visit
+    def _remainingTree(self, waitingMask, onBusMask):
+        indices = []
 
-                self._distMat[i,j] = \
-                    metric.compute(MapState(junctionIds[i], roads[junctionIds[i]].coordinates),
-                                 MapState(junctionIds[j], roads[junctionIds[j]].coordinates))
+        while waitingMask:
+            lowest = waitingMask & -waitingMask
+            i = lowest.bit_length() - 1
+            indices.append(self._pickupIdx[i])
+            indices.append(self._dropoffIdx[i])
+            waitingMask ^= lowest
 
-    def estimate(self, problem, state):
-        # Get indices of active orders in the given state
-        if len(state.waitingOrders) + len(state.ordersOnBus) <= 1:
-            return 0
+        while onBusMask:
+            lowest = onBusMask & -onBusMask
+            indices.append(self._dropoffIdx[lowest.bit_length() - 1])
+            onBusMask ^= lowest
+
+        remaining = np.unique(np.array(indices, dtype=int))
+        return self._primWeight(self._distMat[remaining[:, None], remaining]), remaining
 
-        activeLocations = set(np.hstack([state.junctionIdx] +
-                                        [[o[0],o[1]] for o in state.waitingOrders] +
-                                        [o[1] for o in state.ordersOnBus]))
+    # Prim's algorithm over a dense matrix, in O(n^2)
+    @staticmethod
+    def _primWeight(matrix):
+        n = len(matrix)
+        if n <= 1:
+            return 0
 
-        indices = np.array([self._junctionToMatIdx[o] for o in activeLocations])
-        row_idx = indices
-        col_idx = indices
+        inTree = np.zeros(n, dtype=bool)
+        inTree[0] = True
+        # The cheapest edge from every location to the tree
+        connection = matrix[0].copy()
+        connection[0] = np.inf
+        weight = 0
 
-        # Compute MST, which is the shortest possible weight of a path between all vertices
-        mst = minimum_spanning_tree(self._distMat[row_idx[:, None], col_idx], overwrite=False)
+        for _ in range(n - 1):
+            v = int(np.argmin(connection))
+            weight += connection[v]
+            inTree[v] = True
+            np.minimum(connection, matrix[v], out=connection)
+            connection[inTree] = np.inf
 
-        return np.sum(mst)
\ No newline at end of file
+        return weight
@@ -1,14 +1,26 @@
 from heuristics import Heuristic
+from costs import L2DistanceCost, DistanceMatrix
 
-# TODO : Implement as explained in the instructions
+# The bus has to reach every remaining pickup and drop-off location, and in particular the farthest one,
+# so the distance to the farthest remaining location is a lower bound for the rest of the route.
 class TSPCustomHeuristic(Heuristic):
     _distMat = None
-    _junctionToMatIdx = None
 
-    # TODO : You can add parameters if you need them
-    def __init__(self, roads, initialState):
+    # metric is the cost between locations (the L2 aerial distance by default). It may also be a ready DistanceMatrix
+    def __init__(self, roads, initialState, metric=None):
         super().__init__()
 
+        if isinstance(metric, DistanceMatrix):
+            self._distMat = metric
+        else:
+            locations = [initialState.junctionIdx] + [j for o in initialState.waitingOrders for j in o] + \
+                        [o[1] for o in initialState.ordersOnBus]
+            self._distMat = DistanceMatrix(roads, locations, metric if metric is not None else L2DistanceCost(roads))
+
     # Estimate heuristically the minimal cost from the given state to the problem's goal
     def estimate(self, problem, state):
-        raise NotImplementedError
\ No newline at end of file
+        remaining = [j for o in state.waitingOrders for j in o] + [o[1] for o in state.ordersOnBus]
+        if not remaining:
+            return 0
+
+        return max(self._distMat.distancesFrom(state.junctionIdx, remaining))
@@ -0,0 +1,9 @@
+from . import Heuristic
+from ways.distance import distance
+from ways.info import MAX_SPEED
+from ways.traffic import KMH_TO_METERS_PER_MINUTE
+
+# The aerial distance at the highest speed on the map (in minutes): no link is faster, at any time
+class TravelTimeHeuristic(Heuristic):
+    def estimate(self, problem, state):
+        return distance(state.coordinates, problem.target.coordinates) / (MAX_SPEED * KMH_TO_METERS_PER_MINUTE)
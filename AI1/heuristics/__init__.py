@@ -1,5 +1,7 @@
 from .heuristic import Heuristic
 from .L2DistanceHeuristic import L2DistanceHeuristic
+from .LandmarkHeuristic import LandmarkHeuristic
 from .MSTHeuristic import MSTHeuristic
 from .NullHeuristic import NullHeuristic
-from .TSPCustomHeuristic import TSPCustomHeuristic
\ No newline at end of file
+from .TSPCustomHeuristic import TSPCustomHeuristic
+from .TravelTimeHeuristic import TravelTimeHeuristic
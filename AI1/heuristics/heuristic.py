@@ -4,3 +4,8 @@ class Heuristic(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def estimate(self, problem, state):
         raise NotImplementedError
+
+    # The part of the search cache keys that identifies the heuristic (see AStar._cacheKey): its class, and
+    # the parameters its estimates depend on, as numbers and strings. Heuristics with parameters override it
+    def cacheKey(self):
+        return (type(self).__name__,)
@@ -0,0 +1,140 @@
+import numpy as np
+import itertools
+from astar import AStar
+from consts import Consts
+
+# Iterative deepening A* (IDA*): depth first searches bounded by f = g + h, each with the threshold raised to the
+# lowest f that went over the previous one. Only the current path and the successors still to try on it are kept,
+# instead of every generated state as in AStar.
+# A transposition table (the lowest g every state was reached with in the current iteration) prunes the states that
+# are reached again on a path that is not cheaper, and the estimates learned in one iteration (see _depthFirst) are
+# kept for the next ones. Each holds at most tableSize states: once full, a new state replaces the oldest one, so the
+# memory stays bounded and the search only gets slower.
+class IDAStar(AStar):
+    tableSize = None
+    # The most states held at once (the path, the successors waiting on it and the tables) in the last run()
+    peakNodes = None
+
+    def __init__(self, heuristic, cost=None, tableSize=Consts.IDASTAR_TABLE_SIZE, shouldCache=False, cache=None):
+        super().__init__(heuristic, cost, shouldCache, cache)
+        self.tableSize = tableSize
+
+    # The table size changes the developed count
+    def _engineKey(self):
+        return (type(self).__name__, self.tableSize)
+
+    # Run IDA*. Returns the same tuple as AStar.run, counting the states developed over all the iterations
+    def run(self, problem):
+        if self.shouldCache:
+            res = self._getFromCache(problem)
+
+            if res is not None:
+                return res
+
+        if self._isUnreachable(problem):
+            return ([], -1, -1, 0)
+
+        hI = self.heuristic.estimate(problem, problem.initialState)
+        threshold = hI
+        # The estimates learned from the previous iterations
+        learned = {}
+        self.peakNodes = 0
+        developed = 0
+
+        while threshold < np.inf:
+            path, g, threshold, iterationDeveloped = self._depthFirst(problem, threshold, learned)
+            developed += iterationDeveloped
+
+            if path is not None:
+                res = (path, g, hI, developed)
+                self._storeInCache(problem, res)
+                return res
+
+        return ([], -1, -1, developed)
+
+    def _estimate(self, problem, state, learned):
+        h = self.heuristic.estimate(problem, state)
+        return max(h, learned.get(state, h))
+
+    # One depth first search, without recursion. Returns (path, g, next threshold, developed), where the path is
+    # None if there is no goal within the threshold.
+    # When the search backs up from a state, the lowest f of the paths under it that were cut (over the threshold,
+    # or pruned, with the f they had when pruned) is a lower bound for the paths through it, so its estimate is
+    # raised to that f minus its g for the next iterations.
+    def _depthFirst(self, problem, threshold, learned):
+        source = problem.initialState
+        path, pathG, onPath = [source], [0], {source}
+        # The successors still to try from every state on the path (the one with the lowest f last),
+        # and the lowest f of the paths through it that were cut so far
+        frames = []
+        table = {}
+        self._remember(table, source, 0)
+        tieBreaker = itertools.count()
+        nextThreshold = np.inf
+        pending = 0
+        developed = 0
+
+        while path:
+            if len(frames) < len(path):
+                # Entered a new state
+                state, g = path[-1], pathG[-1]
+                if problem.isGoal(state):
+                    return path, g, threshold, developed
+
+                developed += 1
+                successors = []
+                cutF = np.inf
+                for successor, cost in problem.expandWithCosts(state, self.cost):
+                    new_g = g + cost
+                    f = new_g + self._estimate(problem, successor, learned)
+                    if f > threshold or successor in onPath or new_g >= table.get(successor, np.inf):
+                        cutF = min(cutF, f)
+                        if f > threshold:
+                            nextThreshold = min(nextThreshold, f)
+                        continue
+
+                    successors.append((f, next(tieBreaker), new_g, successor))
+
+                successors.sort(reverse=True)
+                frames.append([successors, cutF])
+                pending += len(successors)
+                self.peakNodes = max(self.peakNodes, len(path) + pending + len(table) + len(learned))
+
+            # Go down to the next successor that was not reached more cheaply in the meantime, or back up
+            frame = frames[-1]
+            successors = frame[0]
+            while successors:
+                f, _, new_g, successor = successors.pop()
+                pending -= 1
+                if successor not in onPath and new_g < table.get(successor, np.inf):
+                    break
+                frame[1] = min(frame[1], f)
+            else:
+                frames.pop()
+                state, g = path.pop(), pathG.pop()
+                onPath.discard(state)
+
+                cutF = frame[1]
+                if cutF < np.inf:
+                    self._remember(learned, state, max(learned.get(state, 0), cutF - g))
+                if frames:
+                    frames[-1][1] = min(frames[-1][1], cutF)
+                continue
+
+            self._remember(table, successor, new_g)
+            path.append(successor)
+            pathG.append(new_g)
+            onPath.add(successor)
+
+        return None, None, nextThreshold, developed
+
+    # Store a value in a table of at most tableSize states, evicting the oldest state if it is full.
+    # With tableSize 0 nothing is stored
+    def _remember(self, table, state, value):
+        if self.tableSize <= 0:
+            return
+
+        if state not in table and len(table) >= self.tableSize:
+            del table[next(iter(table))]
+
+        table[state] = value
@@ -0,0 +1,79 @@
+import socket
+import time
+
+# Sources of orders for StreamingBusProblem. Every source is an iterator of (pickup, drop-off) junction pairs,
+# so any iterable of pairs (a list, a generator) is a source as well. A source may never end: take a part of it
+# with itertools.islice, or pass limit to StreamingBusProblem.addOrders.
+
+# An order is a line with a pickup and a drop-off junction, separated by a tab or spaces (the format of the .in files).
+# Returns None for any other line, e.g. the header lines of a .in file
+def parseOrder(line):
+    fields = line.split()
+    if len(fields) != 2:
+        return None
+
+    try:
+        return int(fields[0]), int(fields[1])
+    except ValueError:
+        return None
+
+# The orders of a text stream, one per line
+def linesOrders(lines):
+    for line in lines:
+        order = parseOrder(line)
+        if order is not None:
+            yield order
+
+# Follows a file like `tail -f`: yields the orders already in it, and then the orders appended to it.
+# Stops when no line was appended for idleTimeout seconds (None to follow the file forever)
+def tailOrders(filePath, pollInterval=0.5, idleTimeout=None):
+    with open(filePath, "r") as f:
+        pending = ""
+        lastLineTime = time.time()
+
+        while True:
+            line = f.readline()
+            if line:
+                # A line is complete only once its newline was written
+                pending += line
+                if pending.endswith("\n"):
+                    order = parseOrder(pending)
+                    pending = ""
+                    lastLineTime = time.time()
+                    if order is not None:
+                        yield order
+                continue
+
+            if idleTimeout is not None and time.time() - lastLineTime >= idleTimeout:
+                if pending:
+                    order = parseOrder(pending)
+                    if order is not None:
+                        yield order
+                return
+
+            time.sleep(pollInterval)
+
+# A stand-in for the production feed: listens on a local TCP port, and yields the orders sent by the clients
+# (one per line, as in the .in files), one client after the other. Stops after maxClients clients (None for never)
+def socketOrders(port, host="127.0.0.1", maxClients=None):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    try:
+        server.bind((host, port))
+        server.listen(1)
+
+        clients = 0
+        while maxClients is None or clients < maxClients:
+            connection, _ = server.accept()
+            clients += 1
+
+            with connection, connection.makefile("r") as lines:
+                yield from linesOrders(lines)
+    finally:
+        server.close()
+
+# Sends orders to a socketOrders source, e.g. from a test script or another process
+def sendOrders(orders, port, host="127.0.0.1"):
+    with socket.create_connection((host, port)) as connection:
+        connection.sendall("".join("{}\t{}\n".format(*order) for order in orders).encode())
@@ -12,15 +12,54 @@ class Path:
 
         # Get links
         for s,t in zip(junctions[:-1], junctions[1:]):
-            wasFound = False
-            for l in self.roads[s].links:
-                if l.target == t:
-                    self.links.append(l)
-                    wasFound = True
-                    break
+            l = self.roads.link(s, t)
 
-            assert wasFound, "Two adjacent vertices in the path have no link between them"
+            assert l is not None, "Two adjacent vertices in the path have no link between them"
+            self.links.append(l)
 
     # Returns path length in meters
     def getDistance(self):
         return sum([l.distance for l in self.links])
+
+# The result of BusSolver.plan: the picking order, and the distance and junctions of every leg between two consecutive
+# locations. The path itself (with its links) is only built when its junctions or links are accessed
+# (e.g. by ways.draw.plotPath), once, in time linear in its length.
+class PickingPlan:
+    roads = None
+    pickingOrder = None
+    legDistances = None
+    _legJunctions = None
+    _path = None
+
+    # legJunctions[i] is the list of junctions of the leg from pickingOrder[i] to pickingOrder[i + 1]
+    def __init__(self, roads, pickingOrder, legDistances, legJunctions):
+        self.roads = roads
+        self.pickingOrder = pickingOrder
+        self.legDistances = legDistances
+        self._legJunctions = legJunctions
+
+    # Returns path length in meters (inf if one of the legs has no path)
+    def getDistance(self):
+        return sum(self.legDistances)
+
+    def toPath(self):
+        if self._path is None:
+            junctions = [self.pickingOrder[0]]
+
+            for i, legJunctions in enumerate(self._legJunctions):
+                if not legJunctions:
+                    raise ValueError("There is no path from junction {} to junction {} (leg {} of the picking order)"
+                                     .format(self.pickingOrder[i], self.pickingOrder[i + 1], i))
+                junctions.extend(legJunctions[1:])
+
+            self._path = Path(self.roads, junctions)
+
+        return self._path
+
+    @property
+    def junctions(self):
+        return self.toPath().junctions
+
+    @property
+    def links(self):
+        return self.toPath().links
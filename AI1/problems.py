@@ -34,6 +34,7 @@ from states import MapState
 class MapProblem(Problem):
     target = None
     _roads = None
+    isReversed = False
     def __init__(self, roads, source, target):
         self._roads = roads
         I = MapState(source, roads[source].coordinates)
@@ -45,30 +46,137 @@ class MapProblem(Problem):
         return hash((self.initialState, self.target))
 
     def __eq__(self, other):
-        return (self.initialState, self.target) == (other.initialState, other.target)
+        return (self.initialState, self.target, self.isReversed) == \
+               (other.initialState, other.target, other.isReversed)
+
+    # A key that identifies the query across processes (used by the search caches). It includes the fingerprint
+    # of the map, so a cache kept on disk does not answer for another map (a changed CSV, a region or a slice)
+    def cacheKey(self):
+        return (self._roads.fingerprint(), self.initialState.junctionIdx, self.target.junctionIdx, self.isReversed)
 
     def _calculateCost(self, fromState, toState):
-        for l in self._roads[fromState.junctionIdx].links:
-            if l.target == toState.junctionIdx:
-                return l.distance
+        l = self._roads.link(fromState.junctionIdx, toState.junctionIdx)
+
+        if l is None:
+            raise ValueError
 
-        raise ValueError
+        return l.distance
 
     def expand(self, state):
         for l in self._roads[state.junctionIdx].links:
-            yield MapState(l.target, self._roads[state.junctionIdx].coordinates)
+            yield MapState(l.target, self._roads[l.target].coordinates)
+
+    # Without a cost computer the cost of a successor is the distance of its link, which expand already has
+    def expandWithCosts(self, state, costComputer=None):
+        if costComputer is not None:
+            yield from super().expandWithCosts(state, costComputer)
+            return
+
+        for l in self._roads[state.junctionIdx].links:
+            yield MapState(l.target, self._roads[l.target].coordinates), l.distance
 
     def isGoal(self, state):
         return state.junctionIdx == self.target.junctionIdx
 
-from states import BusState
+    # True when the components of the map prove there is no path from the source to the target, in O(1).
+    # Only maps whose components are already labeled are checked (see ways.algorithms.is_unreachable); this never
+    # labels the map. The check is partial: False does not mean there is a path
+    def isUnreachable(self):
+        from ways.algorithms import is_unreachable
+
+        source, target = self.initialState.junctionIdx, self.target.junctionIdx
+        if self.isReversed:
+            source, target = target, source
+        return is_unreachable(self._roads, source, target)
+
+    # Return the same query, searched backwards from the target
+    def reversed(self):
+        return ReversedMapProblem(self._roads, self.target.junctionIdx, self.initialState.junctionIdx)
+
+# Searches backwards over the links entering each junction: the successors of a state are its predecessors
+# on the map. A heuristic should bound the distance from problem.target to the state (check isReversed).
+class ReversedMapProblem(MapProblem):
+    isReversed = True
+
+    def __hash__(self):
+        return hash((self.initialState, self.target, self.isReversed))
+
+    def _calculateCost(self, fromState, toState):
+        return super()._calculateCost(toState, fromState)
+
+    def expand(self, state):
+        for l in self._roads.reverse_links(state.junctionIdx):
+            yield MapState(l.source, self._roads[l.source].coordinates)
+
+    # The costs are of the links themselves, i.e. computed from the predecessor to the state
+    def expandWithCosts(self, state, costComputer=None):
+        for l in self._roads.reverse_links(state.junctionIdx):
+            s = MapState(l.source, self._roads[l.source].coordinates)
+            yield s, l.distance if costComputer is None else costComputer.compute(s, state)
+
+    def reversed(self):
+        return MapProblem(self._roads, self.target.junctionIdx, self.initialState.junctionIdx)
+
+from states import TimedMapState
+
+# A MapProblem whose costs are travel times (in minutes) when leaving the source at departureMinute,
+# see ways.traffic. The states carry the time they are reached at, and the travel time of every link depends on it.
+# The travel times are FIFO, so the earliest arrival at every junction is the only one worth keeping, and A*
+# works unchanged (with an optimistic heuristic such as TravelTimeHeuristic). The arrival time is not known before
+# the search, so there is no backward search of travel times, and the problem is not for BidirectionalAStar.
+class TimeDependentMapProblem(MapProblem):
+    departureMinute = None
+    _travelTimes = None
+
+    def __init__(self, roads, source, target, departureMinute, travelTimes=None):
+        from ways.traffic import travel_times
+
+        super().__init__(roads, source, target)
+        self.departureMinute = departureMinute
+        self._travelTimes = travelTimes if travelTimes is not None else travel_times(roads)
+        self.initialState = TimedMapState(source, roads[source].coordinates, departureMinute)
+
+    def __hash__(self):
+        return hash((self.initialState, self.target, self.departureMinute))
+
+    def __eq__(self, other):
+        return super().__eq__(other) and self.departureMinute == getattr(other, 'departureMinute', None)
+
+    def cacheKey(self):
+        return super().cacheKey() + (self.departureMinute,)
+
+    def _calculateCost(self, fromState, toState):
+        return float(self._travelTimes.travel_time(self._travelTimes.link_id(fromState.junctionIdx,
+                                                                              toState.junctionIdx), fromState.time))
+
+    def expand(self, state):
+        for s, _ in self.expandWithCosts(state):
+            yield s
+
+    # The travel times of all the links of a junction are computed together.
+    # A cost computer (e.g. costs.TravelTimeCost) gets the state with its time
+    def expandWithCosts(self, state, costComputer=None):
+        linkIds = self._travelTimes.links_from(state.junctionIdx)
+        targets = self._travelTimes.roads.ids[self._travelTimes.roads.target_positions[linkIds]].tolist()
+
+        if costComputer is None:
+            costs = self._travelTimes.travel_time(linkIds, state.time).tolist()
+        else:
+            costs = costComputer.computeMany(state, [MapState(t, self._roads[t].coordinates) for t in targets])
+
+        for target, cost in zip(targets, costs):
+            yield TimedMapState(target, self._roads[target].coordinates, state.time + cost), cost
+
+from states import BusState, OrderTable
 
 class BusProblem(Problem):
     orders = None
+    orderTable = None
     def __init__(self, startingPoint:int, orders:list):
         self.orders = orders
+        self.orderTable = OrderTable(orders)
 
-        I = BusState(startingPoint, self.orders.copy(), [], [])
+        I = BusState.fromMasks(self.orderTable, startingPoint, self.orderTable.allMask, 0)
         super().__init__(I)
 
     def isGoal(self, state):
@@ -79,23 +187,50 @@ class BusProblem(Problem):
 
     # Return all the successors of a given state
     def expand(self, state):
-        for order in state.waitingOrders:
-            yield self._getNewStateAtLoc(state, order[0])
+        state = self._adoptState(state)
+        orders = self.orderTable.orders
 
-        for order in state.ordersOnBus:
-            yield self._getNewStateAtLoc(state, order[1])
+        mask = state.waitingMask
+        while mask:
+            lowest = mask & -mask
+            yield self._getNewStateAtLoc(state, orders[lowest.bit_length() - 1][0])
+            mask ^= lowest
 
-    # Get the new state created after going from one state to a new location (on map)
+        mask = state.onBusMask
+        while mask:
+            lowest = mask & -mask
+            yield self._getNewStateAtLoc(state, orders[lowest.bit_length() - 1][1])
+            mask ^= lowest
+
+    # Get the new state created after going from one state to a new location (on map):
+    # the waiting orders of that location get on the bus, and the orders on the bus that end there get off
     def _getNewStateAtLoc(self, previousState, newLoc):
-        # TODO : Implement -V
-        newWaiting = [order for order in previousState.waitingOrders if(newLoc != order[0])]
-        newPassengers = [order for order in self.orders if (newLoc == order[0])]
-        newOnBus = [order for order in previousState.ordersOnBus if(newLoc != order[1])] + newPassengers
-        newFinished = set(self.orders) - set(newWaiting) - set(newOnBus)
-        return BusState(newLoc, newWaiting, newOnBus, newFinished)
+        pickedUp = previousState.waitingMask & self.orderTable.pickupsAt(newLoc)
+        newOnBus = (previousState.onBusMask & ~self.orderTable.dropoffsAt(newLoc)) | pickedUp
+        return BusState.fromMasks(self.orderTable, newLoc, previousState.waitingMask & ~pickedUp, newOnBus)
+
+    # States built by hand (from lists of orders) are re-encoded over the order table of this problem
+    def _adoptState(self, state):
+        if state.orderTable is self.orderTable:
+            return state
+
+        return BusState.fromMasks(self.orderTable, state.junctionIdx,
+                                  self.orderTable.encode(state.waitingOrders), self.orderTable.encode(state.ordersOnBus))
 
+    # The orders no bus can complete on the map: an end of the order (or the starting point) is not on the map,
+    # or (on maps whose components are labeled, see ways.algorithms.is_unreachable) the pickup cannot be reached
+    # from the starting point, or the drop-off from the pickup. Found before any search starts
+    def unreachableOrders(self, roads):
+        from ways.algorithms import is_unreachable
+
+        start = self.initialState.junctionIdx
+        return [order for order in self.orders
+                if start not in roads or order[0] not in roads or order[1] not in roads or
+                is_unreachable(roads, start, order[0]) or is_unreachable(roads, order[0], order[1])]
+
+    # With roads, a problem with orders that cannot be completed on them is rejected (ValueError) and the orders listed
     @staticmethod
-    def load(filepath):
+    def load(filepath, roads=None):
         with open(filepath, "r") as f:
             startingPoint = int(f.readline())
             ordersNum = int(f.readline())
@@ -106,4 +241,59 @@ class BusProblem(Problem):
                 order = f.readline().split("\t")
                 orders[i] = (int(order[0]), int(order[1]))
 
-        return BusProblem(startingPoint, orders)
\ No newline at end of file
+        problem = BusProblem(startingPoint, orders)
+        if roads is not None:
+            unreachable = problem.unreachableOrders(roads)
+            if unreachable:
+                raise ValueError("{}: the orders {} cannot be completed from junction {}".format(
+                    filepath, unreachable, startingPoint))
+
+        return problem
+
+# A bus problem whose orders arrive while the bus is already driving.
+# initialState is the current state of the bus: new orders join its waiting orders, and moveTo drives it.
+# With a metric, the problem keeps a DistanceMatrix over its locations (starting point, pickups and drop-offs),
+# extended with the costs to and from the locations of every new order only, so a solver that scores with
+# problem.distances can re-plan from the current state without computing any cost twice.
+class StreamingBusProblem(BusProblem):
+    distances = None
+
+    def __init__(self, startingPoint:int, orders=(), roads=None, metric=None):
+        super().__init__(startingPoint, [])
+        # The orders grow with the table
+        self.orders = self.orderTable.orders
+
+        if metric is not None:
+            from costs import DistanceMatrix
+            self.distances = DistanceMatrix(roads, [startingPoint], metric)
+
+        self.addOrders(orders)
+
+    # Add an order. It waits for the bus from now on
+    def addOrder(self, order):
+        self.addOrders([order])
+
+    # Add the orders of a source (any iterable of orders, see orderStreams), or only its first `limit` orders.
+    # The locations of all the added orders are added to the distance matrix together. Returns the number of orders
+    def addOrders(self, source, limit=None):
+        from itertools import islice
+
+        orders = [tuple(order) for order in islice(source, limit)]
+        if self.distances is not None:
+            self.distances.extend([j for order in orders for j in order])
+
+        waitingMask = self.initialState.waitingMask
+        for order in orders:
+            waitingMask |= 1 << self.orderTable.append(order)
+
+        state = self.initialState
+        self.initialState = BusState.fromMasks(self.orderTable, state.junctionIdx, waitingMask, state.onBusMask)
+        return len(orders)
+
+    # Drive the bus to a location: its waiting orders there get on, and the orders on the bus that end there get off.
+    # The location may be any junction (e.g. between two stops); it is added to the distance matrix if it is not in it
+    def moveTo(self, junctionIdx):
+        if self.distances is not None:
+            self.distances.extend([junctionIdx])
+        self.initialState = self._getNewStateAtLoc(self.initialState, junctionIdx)
+        return self.initialState
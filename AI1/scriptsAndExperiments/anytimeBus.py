@@ -0,0 +1,35 @@
+##########################################
+# Runs the anytime A* (ARA*) on the bus problems,
+# printing every improved solution with its bound,
+# and the best solution found within a time budget.
+##########################################
+from consts import Consts
+from astar import AStar
+from anytimeAstar import AnytimeAStar
+from ways import load_map_from_csv
+from problems import BusProblem
+from heuristics import L2DistanceHeuristic, MSTHeuristic
+from costs import DistanceMatrix
+from costs.actualDistanceCost import ActualDistanceCost
+import time
+
+# Seconds
+TIME_BUDGET = 1.0
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+mapAstar = AStar(L2DistanceHeuristic(), shouldCache=True)
+
+for fileName in ["TLV_5.in", "SDEROT_50.in", "HAIFA_100.in"]:
+    prob = BusProblem.load(Consts.getDataFilePath(fileName))
+    cost = DistanceMatrix.forProblem(roads, prob, ActualDistanceCost(roads, mapAstar))
+    mstH = MSTHeuristic(roads, prob.initialState, cost)
+
+    print("{}:".format(fileName))
+    start = time.time()
+    for _, g, _, developed, bound in AnytimeAStar(mstH, cost=cost).iterSolutions(prob, TIME_BUDGET):
+        print("\t{:.2f}sec: {:.2f}km (at most {:.3f} times the optimum), developed: {} states".format(
+            time.time() - start, g / 1000, bound, developed))
+
+    anytimeAstar = AnytimeAStar(mstH, cost=cost, timeBudget=TIME_BUDGET)
+    _, g, _, developed = anytimeAstar.run(prob)
+    print("\tWithin {}sec: {:.2f}km, bound {:.3f}".format(TIME_BUDGET, g / 1000, anytimeAstar.bound))
@@ -0,0 +1,30 @@
+##########################################
+# Measures the raw A* expansion rate on the
+# order pairs of the given problem files.
+##########################################
+from consts import Consts
+from astar import AStar
+from ways import load_map_from_csv
+from problems import BusProblem, MapProblem
+from heuristics import L2DistanceHeuristic
+import time
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+
+for fileName in ["TLV_5.in", "HAIFA_100.in"]:
+    print("{}:".format(fileName).ljust(20), flush=True, end="")
+
+    prob = BusProblem.load(Consts.getDataFilePath(fileName))
+
+    # No caching - we want to measure the search itself
+    mapAstar = AStar(L2DistanceHeuristic())
+
+    developed = 0
+    start = time.time()
+    for order in prob.orders:
+        _, _, _, orderDeveloped = mapAstar.run(MapProblem(roads, order[0], order[1]))
+        developed += orderDeveloped
+    elapsed = time.time() - start
+
+    print("{} expansions in {:.2f}sec ({:.0f} expansions/sec)".format(
+        developed, elapsed, developed / elapsed if elapsed > 0 else 0))
@@ -0,0 +1,26 @@
+##########################################
+# Compares the states developed by A* and by
+# bidirectional A* on the order pairs.
+##########################################
+from consts import Consts
+from astar import AStar
+from bidirectionalAstar import BidirectionalAStar
+from ways import load_map_from_csv
+from problems import BusProblem, MapProblem
+from heuristics import L2DistanceHeuristic
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+
+for fileName in ["TLV_5.in", "SDEROT_50.in", "BEER_SHEVA_100.in", "HAIFA_100.in"]:
+    print("{}:".format(fileName).ljust(20), flush=True, end="")
+
+    prob = BusProblem.load(Consts.getDataFilePath(fileName))
+
+    developed = {}
+    for searchType in [AStar, BidirectionalAStar]:
+        search = searchType(L2DistanceHeuristic())
+        developed[searchType] = sum(search.run(MapProblem(roads, o[0], o[1]))[3] for o in prob.orders)
+
+    print("A*: {} states, bidirectional A*: {} states ({:.1f}%)".format(
+        developed[AStar], developed[BidirectionalAStar],
+        100 * developed[BidirectionalAStar] / max(developed[AStar], 1)))
@@ -29,7 +29,7 @@ solver = GreedyStochasticSolver(roads, mapAstar, scorer,
                                 Consts.STOCH_TOP_SCORES_TO_CONSIDER)
 
 REPEATS = 200
-results = [solver.solve(prob).getDistance() / 1000 for _ in range(REPEATS)]
+results = [solver.plan(prob).getDistance() / 1000 for _ in range(REPEATS)]
 
 print("Stochastic ({} repetitions): {}km".format(REPEATS, min(results)))
 
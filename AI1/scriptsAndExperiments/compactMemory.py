@@ -0,0 +1,17 @@
+##########################################
+# Compares the memory footprint of the dict
+# based Roads and the array based CompactRoads.
+##########################################
+from consts import Consts
+from ways import load_map_from_csv, load_compact_map_from_csv
+import tracemalloc
+
+for loader in [load_map_from_csv, load_compact_map_from_csv]:
+    tracemalloc.start()
+    roads = loader(Consts.getDataFilePath("israel.csv"))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("{}:".format(type(roads).__name__).ljust(20) + "{:.1f}MB held, {:.1f}MB peak while loading".format(
+        current / 2**20, peak / 2**20))
+    del roads
@@ -0,0 +1,33 @@
+##########################################
+# Builds (once) the contraction hierarchy of the
+# map and compares its queries with A*.
+##########################################
+from consts import Consts
+from astar import AStar
+from contractionHierarchy import ContractionHierarchy
+from ways import load_map_from_csv
+from problems import BusProblem, MapProblem
+from heuristics import L2DistanceHeuristic
+import time
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+
+start = time.time()
+ch = ContractionHierarchy.loadOrBuild(roads, Consts.getDataFilePath("israel.ch.npz"))
+print("Contraction hierarchy ready in {:.2f}sec".format(time.time() - start))
+
+for fileName in ["TLV_5.in", "SDEROT_50.in", "BEER_SHEVA_100.in", "HAIFA_100.in"]:
+    print("{}:".format(fileName).ljust(20), flush=True, end="")
+
+    prob = BusProblem.load(Consts.getDataFilePath(fileName))
+
+    results = []
+    for engine in [AStar(L2DistanceHeuristic()), ch]:
+        start = time.time()
+        runs = [engine.run(MapProblem(roads, o[0], o[1])) for o in prob.orders]
+        results.append((sum(r[1] for r in runs), sum(r[3] for r in runs), time.time() - start))
+
+    (astarDistance, astarDeveloped, astarTime), (chDistance, chDeveloped, chTime) = results
+    assert abs(astarDistance - chDistance) < 1e-6, "The contraction hierarchy found different distances"
+    print("A*: {} states in {:.2f}sec, CH: {} states in {:.2f}sec".format(
+        astarDeveloped, astarTime, chDeveloped, chTime))
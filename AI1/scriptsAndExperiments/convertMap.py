@@ -0,0 +1,10 @@
+##########################################
+# Converts israel.csv to the binary map cache
+# once, so load_cached_map is fast afterwards.
+##########################################
+from consts import Consts
+from ways.storage import convert_map, cache_path
+
+fileName = Consts.getDataFilePath("israel.csv")
+roads = convert_map(fileName)
+print("Saved {} junctions and {} links to {}".format(len(roads), len(roads.target_positions), cache_path(fileName)))
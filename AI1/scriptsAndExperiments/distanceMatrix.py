@@ -0,0 +1,33 @@
+##########################################
+# Times the order-location distance matrix:
+# pairwise A* runs against the bulk computation.
+##########################################
+from consts import Consts
+from astar import AStar
+from ways import load_map_from_csv
+from problems import BusProblem
+from heuristics import L2DistanceHeuristic
+from costs import Cost, DistanceMatrix
+from costs.actualDistanceCost import ActualDistanceCost
+from states import MapState
+import time
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+
+for fileName in ["TLV_5.in", "SDEROT_50.in", "BEER_SHEVA_100.in", "HAIFA_100.in"]:
+    print("{}:".format(fileName).ljust(20), flush=True, end="")
+
+    prob = BusProblem.load(Consts.getDataFilePath(fileName))
+    metric = ActualDistanceCost(roads, AStar(L2DistanceHeuristic()))
+
+    start = time.time()
+    bulk = DistanceMatrix.forProblem(roads, prob, metric)
+    print("bulk: {:.2f}sec".format(time.time() - start), flush=True, end="")
+
+    # One A* per pair is only feasible on the small instances
+    if len(prob.orders) <= 10:
+        start = time.time()
+        Cost.computeMatrix(metric, [MapState(j, roads[j].coordinates) for j in bulk.junctionIds])
+        print(", pairwise: {:.2f}sec".format(time.time() - start), end="")
+
+    print()
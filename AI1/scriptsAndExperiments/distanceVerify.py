@@ -0,0 +1,64 @@
+##########################################
+# Checks the vectorized distances of ways.distance
+# against the reference compute_distance,
+# and times them.
+##########################################
+from ways.tools import compute_distance
+from ways.distance import distance, pairwise_distances, distances_from, distance_matrix, METHODS
+import numpy as np
+import time
+
+# Israel's bounding box, roughly
+LAT_RANGE = (29.4, 33.4)
+LON_RANGE = (34.2, 35.9)
+POINTS_NUM = 1000
+
+# The arccos of compute_distance loses ~0.1m near zero, so short distances are compared in Meters
+TOLERANCES = {'haversine': (1e-7, 0.5), 'equirectangular': (1e-3, 0.5)}
+
+rng = np.random.RandomState(236501)
+points = np.column_stack((rng.uniform(*LAT_RANGE, POINTS_NUM), rng.uniform(*LON_RANGE, POINTS_NUM)))
+# Add close and identical pairs, for the special cases
+points = np.vstack((points, points[:10] + 0.000001, points[:10] + 0.0001, points[:10]))
+pnts = [tuple(p) for p in points.tolist()]
+
+reference = np.array([[compute_distance(p, q) for q in pnts[:100]] for p in pnts])
+failed = False
+
+for method in METHODS:
+    relative, absolute = TOLERANCES[method]
+    results = {
+        "distance": np.array([[distance(p, q, method) for q in pnts[:100]] for p in pnts]),
+        "pairwise_distances": pairwise_distances(np.repeat(points, 100, axis=0), np.tile(points[:100], (len(pnts), 1)),
+                                                 method).reshape(len(pnts), 100),
+        "distances_from": np.array([distances_from(p, points[:100], method) for p in pnts]),
+        "distance_matrix": distance_matrix(points, points[:100], method),
+    }
+    for name, result in results.items():
+        ok = np.allclose(result, reference, rtol=relative, atol=absolute)
+        failed = failed or not ok
+        print("{} ({}): max error {:.4f}m - {}".format(name, method, np.max(np.abs(result - reference)),
+                                                     "OK" if ok else "FAILED"))
+
+print()
+
+start = time.time()
+for p in pnts[:200]:
+    for q in pnts:
+        compute_distance(p, q)
+scalarTime = time.time() - start
+print("compute_distance: {:.2f}sec".format(scalarTime))
+
+start = time.time()
+for p in pnts[:200]:
+    for q in pnts:
+        distance(p, q)
+print("distance: {:.2f}sec".format(time.time() - start))
+
+for method in METHODS:
+    start = time.time()
+    distance_matrix(points[:200], points, method)
+    print("distance_matrix ({}): {:.4f}sec".format(method, time.time() - start))
+
+if failed:
+    raise SystemExit(1)
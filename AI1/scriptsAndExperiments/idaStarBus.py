@@ -0,0 +1,36 @@
+##########################################
+# Compares A* with IDA* on the bus problems:
+# the same optimal distance, and the states each keeps
+# in memory for a few transposition table sizes.
+##########################################
+from consts import Consts
+from astar import AStar
+from idaStar import IDAStar
+from ways import load_map_from_csv
+from problems import BusProblem
+from heuristics import L2DistanceHeuristic, MSTHeuristic
+from costs import DistanceMatrix
+from costs.actualDistanceCost import ActualDistanceCost
+import time
+
+TABLE_SIZES = [Consts.IDASTAR_TABLE_SIZE, 250, 0]
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+mapAstar = AStar(L2DistanceHeuristic(), shouldCache=True)
+
+for fileName in ["TLV_5.in", "SDEROT_50.in"]:
+    prob = BusProblem.load(Consts.getDataFilePath(fileName))
+    cost = DistanceMatrix.forProblem(roads, prob, ActualDistanceCost(roads, mapAstar))
+    mstH = MSTHeuristic(roads, prob.initialState, cost)
+
+    print("{}:".format(fileName))
+    start = time.time()
+    _, g, _, developed = AStar(mstH, cost=cost).run(prob)
+    print("\tA*: {:.2f}km, developed: {} states, {:.2f}sec".format(g / 1000, developed, time.time() - start))
+
+    for tableSize in TABLE_SIZES:
+        idaStar = IDAStar(mstH, cost=cost, tableSize=tableSize)
+        start = time.time()
+        _, g, _, developed = idaStar.run(prob)
+        print("\tIDA* (table of {}): {:.2f}km, developed: {} states, peak: {} states, {:.2f}sec".format(
+            tableSize, g / 1000, developed, idaStar.peakNodes, time.time() - start))
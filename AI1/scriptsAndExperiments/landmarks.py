@@ -0,0 +1,24 @@
+##########################################
+# Compares the states developed by A* with the
+# air distance and with the landmark heuristic.
+##########################################
+from consts import Consts
+from astar import AStar
+from ways import load_map_from_csv
+from problems import BusProblem, MapProblem
+from heuristics import L2DistanceHeuristic, LandmarkHeuristic
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+
+# The landmark tables are computed on the first run only
+heuristics = [L2DistanceHeuristic(), LandmarkHeuristic(roads, filePath=Consts.getDataFilePath("israel.landmarks.npz"))]
+
+for fileName in ["TLV_5.in", "SDEROT_50.in", "BEER_SHEVA_100.in", "HAIFA_100.in"]:
+    print("{}:".format(fileName).ljust(20), flush=True, end="")
+
+    prob = BusProblem.load(Consts.getDataFilePath(fileName))
+
+    developed = [sum(AStar(h).run(MapProblem(roads, o[0], o[1]))[3] for o in prob.orders) for h in heuristics]
+
+    print("L2: {} states, landmarks: {} states ({:.1f}%)".format(
+        developed[0], developed[1], 100 * developed[1] / max(developed[0], 1)))
@@ -0,0 +1,41 @@
+##########################################
+# Times computing the traffic noise params of all
+# the links of the map, link by link with dhash and
+# in one vectorized pass, checks that both give the
+# same bits, and times the two loaders.
+##########################################
+from consts import Consts
+from ways import load_map_from_csv, tools
+from ways.compact import load_compact_map_from_csv
+from ways.graph import _parse_links
+import csv
+import time
+
+mapPath = Consts.getDataFilePath("israel.csv")
+
+# Parse the links once, so only the params stage is timed
+with open(mapPath, 'rt') as f:
+    sources, targets = [], []
+    for row in csv.reader(f):
+        i = int(row[0])
+        for target, _, _ in _parse_links(i, row[3:]):
+            sources.append(i)
+            targets.append(target)
+print("{} links".format(len(sources)))
+
+start = time.time()
+scalarParams = [tools.generate_traffic_noise_params(s, t) for s, t in zip(sources, targets)]
+scalarTime = time.time() - start
+
+start = time.time()
+cosFrequencies, sinFrequencies = tools.generate_traffic_noise_params_array(sources, targets)
+vectorTime = time.time() - start
+
+# Compare the bits, not just the values
+identical = all(c.hex() == pc.hex() and s.hex() == ps.hex()
+                for (pc, ps), c, s in zip(scalarParams, cosFrequencies.tolist(), sinFrequencies.tolist()))
+print("dhash per link: {:.3f}sec, vectorized: {:.3f}sec ({:.1f}x), bit-identical: {}".format(
+    scalarTime, vectorTime, scalarTime / vectorTime, identical))
+
+load_map_from_csv(mapPath)
+load_compact_map_from_csv(mapPath)
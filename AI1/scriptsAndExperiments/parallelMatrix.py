@@ -0,0 +1,24 @@
+##########################################
+# Measures the speedup of building the order-location
+# distance matrix on several worker processes.
+##########################################
+from consts import Consts
+from ways.storage import load_cached_map
+from problems import BusProblem
+from costs import DistanceMatrix
+from costs.actualDistanceCost import ActualDistanceCost
+import time
+
+if __name__ == '__main__':
+    # Memory-mapped, so the workers share the map instead of copying it
+    roads = load_cached_map(Consts.getDataFilePath("israel.csv"), mmap=True)
+    prob = BusProblem.load(Consts.getDataFilePath("BEER_SHEVA_100.in"))
+
+    baseline = None
+    for workers in [1, 2, 4, 8]:
+        start = time.time()
+        DistanceMatrix.forProblem(roads, prob, ActualDistanceCost(roads, None, workers=workers))
+        elapsed = time.time() - start
+        baseline = baseline or elapsed
+
+        print("{} workers:".format(workers).ljust(20) + "{:.2f}sec (x{:.2f})".format(elapsed, baseline / elapsed))
@@ -0,0 +1,38 @@
+##########################################
+# Times building the hard-coded path of initial.py
+# with a scan of every junction's links and with
+# the link index.
+##########################################
+from consts import Consts
+from ways import load_map_from_csv
+from path import Path
+import ast
+import time
+
+REPEATS = 20
+
+# Take the junction list of the example path straight out of initial.py
+with open("initial.py") as f:
+    junctions = next(ast.literal_eval(node.args[1]) for node in ast.walk(ast.parse(f.read()))
+                     if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "Path")
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+
+
+# The way Path found its links before the index
+def scanLinks(roads, junctions):
+    return [next(l for l in roads[s].links if l.target == t) for s, t in zip(junctions[:-1], junctions[1:])]
+
+
+start = time.time()
+for _ in range(REPEATS):
+    scanLinks(roads, junctions)
+scanTime = (time.time() - start) / REPEATS
+
+start = time.time()
+for _ in range(REPEATS):
+    path = Path(roads, junctions)
+indexTime = (time.time() - start) / REPEATS
+
+print("Path of {} junctions ({:.2f}km)".format(len(junctions), path.getDistance() / 1000))
+print("Scanning links: {:.2f}ms, link index: {:.2f}ms".format(scanTime * 1000, indexTime * 1000))
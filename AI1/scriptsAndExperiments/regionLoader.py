@@ -0,0 +1,46 @@
+##########################################
+# Loads only the region around the orders of the small
+# bus problems (the junctions within RADIUS meters of
+# their start and order points), times it against
+# loading the whole map, and compares the greedy route
+# found on the region with the one on the whole map.
+##########################################
+from consts import Consts
+from ways import load_map_from_csv, load_region_from_csv
+from ways.storage import load_row_index
+from astar import AStar
+from heuristics import L2DistanceHeuristic
+from costs import L2DistanceCost
+from busSolvers import GreedyBestFirstSolver
+from problems import BusProblem
+import time
+
+RADIUS = 2000
+
+mapPath = Consts.getDataFilePath("israel.csv")
+
+# The row index is built once, and read back by the later loads
+start = time.time()
+load_row_index(mapPath)
+print("Row index ready in {:.3f}sec".format(time.time() - start))
+
+start = time.time()
+roads = load_map_from_csv(mapPath)
+fullTime = time.time() - start
+
+for fileName in ["TLV_5.in", "SDEROT_50.in"]:
+    prob = BusProblem.load(Consts.getDataFilePath(fileName))
+    seeds = {prob.initialState.junctionIdx} | {j for order in prob.orders for j in order}
+
+    start = time.time()
+    region = load_region_from_csv(mapPath, seeds=seeds, radius=RADIUS)
+    regionTime = time.time() - start
+
+    results = []
+    for r in [roads, region]:
+        path = GreedyBestFirstSolver(r, AStar(L2DistanceHeuristic(), shouldCache=True), L2DistanceCost(r)).solve(prob)
+        results.append(path.getDistance() / 1000)
+
+    print("{}: whole map {} junctions in {:.3f}sec, region {} junctions in {:.3f}sec".format(
+        fileName, len(roads), fullTime, len(region), regionTime))
+    print("\tgreedy route: {:.2f}km on the whole map, {:.2f}km on the region".format(*results))
@@ -0,0 +1,62 @@
+##########################################
+# Labels the strongly connected components of a slice of
+# the map, and times A* on pairs that have no path between
+# them, with and without the component check. Then checks
+# the orders of the bus problems against the slice.
+# The check is partial, so it is also compared with the
+# pairs Dijkstra finds no path between.
+##########################################
+from consts import Consts
+from ways import load_map_from_csv
+from ways.algorithms import strongly_connected_components, shortest_distances
+from ways.compact import as_compact
+from astar import AStar
+from heuristics import L2DistanceHeuristic
+from problems import MapProblem, BusProblem
+import numpy as np
+import random
+import time
+
+SLICE_SIZE = 700
+PAIRS = 2000
+
+
+# The same problem, without the component check
+class UncheckedMapProblem(MapProblem):
+    def isUnreachable(self):
+        return False
+
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"), count=SLICE_SIZE)
+random.seed(0)
+junctions = list(roads.keys())
+pairs = [tuple(random.sample(junctions, 2)) for _ in range(PAIRS)]
+
+# Before the labeling nothing is checked, and nothing is built on the roads
+checked = sum(MapProblem(roads, s, t).isUnreachable() for s, t in pairs)
+print("Before labeling: {} pairs rejected, compact map built: {}".format(checked, hasattr(roads, '_compact')))
+
+start = time.time()
+labels = strongly_connected_components(roads)
+print("{} junctions, {} strongly connected components, labeled in {:.3f}sec".format(
+    len(roads), len(np.unique(labels)), time.time() - start))
+
+rejected = [(s, t) for s, t in pairs if MapProblem(roads, s, t).isUnreachable()]
+compact = as_compact(roads)
+distances = shortest_distances(compact, [compact.position(s) for s, _ in pairs])
+unreachable = sum(distances[i, compact.position(t)] == np.inf for i, (_, t) in enumerate(pairs))
+print("{} of {} random pairs are rejected without a search, of {} with no path".format(
+    len(rejected), PAIRS, unreachable))
+
+astar = AStar(L2DistanceHeuristic())
+for problemType in [UncheckedMapProblem, MapProblem]:
+    start = time.time()
+    developed = sum(astar.run(problemType(roads, s, t))[3] for s, t in rejected)
+    print("\t{}: {} states developed, {:.3f}sec".format(problemType.__name__, developed, time.time() - start))
+
+for fileName in ["TLV_5.in", "SDEROT_50.in", "HAIFA_100.in", "BEER_SHEVA_100.in"]:
+    try:
+        BusProblem.load(Consts.getDataFilePath(fileName), roads)
+        print("{}: every order can be completed".format(fileName))
+    except ValueError as e:
+        print("{}: {}".format(fileName, e))
@@ -0,0 +1,28 @@
+##########################################
+# Solves the order pairs on a pool of worker
+# processes which share one memory-mapped map.
+##########################################
+from consts import Consts
+from astar import AStar
+from ways.storage import load_cached_map, init_worker, worker_roads
+from problems import BusProblem, MapProblem
+from heuristics import L2DistanceHeuristic
+from concurrent.futures import ProcessPoolExecutor
+
+WORKERS = 4
+
+
+def solveOrder(order):
+    _, distance, _, developed = AStar(L2DistanceHeuristic()).run(MapProblem(worker_roads(), order[0], order[1]))
+    return distance, developed
+
+
+if __name__ == '__main__':
+    roads = load_cached_map(Consts.getDataFilePath("israel.csv"), mmap=True)
+    prob = BusProblem.load(Consts.getDataFilePath("HAIFA_100.in"))
+
+    with ProcessPoolExecutor(WORKERS, initializer=init_worker, initargs=(roads,)) as executor:
+        results = list(executor.map(solveOrder, prob.orders))
+
+    print("Solved {} orders on {} workers: {:.2f}km in total, {} states developed".format(
+        len(results), WORKERS, sum(r[0] for r in results) / 1000, sum(r[1] for r in results)))
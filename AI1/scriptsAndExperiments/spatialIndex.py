@@ -0,0 +1,44 @@
+##########################################
+# Snaps the orders of a bus problem, given as GPS
+# coordinates (the junctions' coordinates plus some
+# noise), back to junctions with the spatial index,
+# and times it against a scan of all the junctions.
+##########################################
+from consts import Consts
+from ways import load_map_from_csv
+from ways.spatial import spatial_index
+from ways.distance import distances_from
+from problems import BusProblem
+import numpy as np
+import time
+
+NOISE_DEGREES = 0.00005
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+prob = BusProblem.load(Consts.getDataFilePath("HAIFA_100.in"))
+
+start = time.time()
+index = spatial_index(roads)
+print("Built the index of {} junctions in {:.3f}sec".format(len(index), time.time() - start))
+
+rng = np.random.RandomState(0)
+coordinates = [tuple(np.array(roads[j].coordinates) + rng.uniform(-NOISE_DEGREES, NOISE_DEGREES, 2)
+                     for j in order) for order in prob.orders]
+
+start = time.time()
+snapped = index.snap_orders(coordinates)
+indexTime = time.time() - start
+
+allPoints = np.array([j.coordinates for j in roads.junctions()])
+allIds = np.array(list(roads.keys()))
+start = time.time()
+scanned = [tuple(int(allIds[np.argmin(distances_from(p, allPoints))]) for p in order) for order in coordinates]
+scanTime = time.time() - start
+
+print("Snapped {} orders: index {:.4f}sec, scan {:.4f}sec, same junctions: {}, back to the original orders: {}".format(
+    len(snapped), indexTime, scanTime, snapped == scanned, snapped == [tuple(o) for o in prob.orders]))
+
+lat, lon = roads.mean_lat_lon
+print("Nearest to the center of the map: {}, 5 nearest: {}".format(index.nearest(lat, lon), index.k_nearest(lat, lon, 5)))
+print("{} junctions within 500m of it, {} in a 0.01 degree box around it".format(
+    len(index.within(lat, lon, 500)), len(index.in_box(lat - 0.005, lon - 0.005, lat + 0.005, lon + 0.005))))
@@ -31,7 +31,7 @@ results = np.zeros((REPEATS,))
 print("Stochastic repeats:")
 for i in range(REPEATS):
     print("{}..".format(i+1), end=" ", flush=True)
-    results[i] = solver.solve(prob).getDistance() / 1000
+    results[i] = solver.plan(prob).getDistance() / 1000
 
 print("\nDone!")
 
@@ -0,0 +1,43 @@
+##########################################
+# stochastic.py on a pool of worker processes:
+# the restarts run in parallel and stream back.
+##########################################
+from consts import Consts
+from astar import AStar
+from ways.storage import load_cached_map
+from busSolvers import GreedyStochasticSolver, StochasticRestartRunner
+from problems import BusProblem
+from costs import L2DistanceCost
+from heuristics import L2DistanceHeuristic
+import numpy as np
+
+REPEATS = 150
+WORKERS = 4
+
+# Stop once this many restarts in a row did not improve the best result
+PATIENCE = None
+
+if __name__ == '__main__':
+    # Memory-mapped, so the workers share the map instead of copying it
+    roads = load_cached_map(Consts.getDataFilePath("israel.csv"), mmap=True)
+    prob = BusProblem.load(Consts.getDataFilePath("HAIFA_100.in"))
+
+    mapAstar = AStar(L2DistanceHeuristic(), shouldCache=True)
+
+    solver = GreedyStochasticSolver(roads, mapAstar, L2DistanceCost(roads),
+                                    Consts.STOCH_INITIAL_TEMPERATURE,
+                                    Consts.STOCH_TEMPERATURE_DECAY_FUNCTION,
+                                    Consts.STOCH_TOP_SCORES_TO_CONSIDER)
+    runner = StochasticRestartRunner(solver, workers=WORKERS, patience=PATIENCE)
+
+    print("Stochastic repeats:")
+    restartIndices, results = [], []
+    for i, distance in runner.iterResults(prob, REPEATS):
+        print("{}..".format(i + 1), end=" ", flush=True)
+        restartIndices.append(i)
+        results.append(distance / 1000)
+
+    results = np.array(results)
+    print("\nDone!")
+    print("{} repeats: best {:.2f}km (restart {}), mean {:.2f}km, std {:.2f}km".format(
+        len(results), results.min(), restartIndices[results.argmin()] + 1, results.mean(), results.std()))
@@ -0,0 +1,53 @@
+##########################################
+# Feeds the orders of a problem to a StreamingBusProblem
+# a few at a time while the bus drives, re-planning
+# greedily from the current state after every batch.
+##########################################
+from consts import Consts
+from astar import AStar
+from ways import load_map_from_csv
+from problems import BusProblem, StreamingBusProblem
+from heuristics import L2DistanceHeuristic
+from costs import DistanceMatrix
+from costs.actualDistanceCost import ActualDistanceCost
+from busSolvers import GreedyBestFirstSolver
+from states import MapState
+import numpy as np
+
+INITIAL_ORDERS = 10
+BATCH_SIZE = 5
+# The number of locations the bus visits between two batches
+LEGS_PER_BATCH = 3
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+prob = BusProblem.load(Consts.getDataFilePath("HAIFA_100.in"))
+mapAstar = AStar(L2DistanceHeuristic(), shouldCache=True)
+
+source = iter(prob.orders)
+streaming = StreamingBusProblem(prob.initialState.junctionIdx, roads=roads, metric=ActualDistanceCost(roads, mapAstar))
+streaming.addOrders(source, INITIAL_ORDERS)
+solver = GreedyBestFirstSolver(roads, mapAstar, streaming.distances)
+
+route = [streaming.initialState.junctionIdx]
+replans = 0
+while True:
+    plan = solver.plan(streaming)
+    replans += 1
+
+    for junctionIdx in plan.pickingOrder[1:LEGS_PER_BATCH + 1]:
+        streaming.moveTo(junctionIdx)
+        route.append(junctionIdx)
+
+    if streaming.addOrders(source, BATCH_SIZE) == 0 and streaming.isGoal(streaming.initialState):
+        break
+
+stops = [MapState(j, roads[j].coordinates) for j in route]
+distance = sum(streaming.distances.compute(a, b) for a, b in zip(stops[:-1], stops[1:]))
+print("{} orders, {} re-plans, route of {} locations: {:.2f}km".format(
+    len(streaming.orders), replans, len(route), distance / 1000))
+
+# The incrementally built matrix has to match the one built at once
+full = DistanceMatrix.forProblem(roads, prob, ActualDistanceCost(roads, mapAstar))
+locations = [MapState(j, roads[j].coordinates) for j in streaming.distances.junctionIds]
+print("Same matrix as DistanceMatrix.forProblem:",
+      np.array_equal(streaming.distances.matrix, full.computeMatrix(locations)))
@@ -0,0 +1,55 @@
+##########################################
+# Time-dependent routing: the fastest route between
+# two junctions at different times of the day, and
+# checks of the travel time engine (FIFO, and the
+# vectorized speeds against link_speed_history).
+##########################################
+from consts import Consts
+from astar import AStar
+from ways import load_map_from_csv
+from ways.traffic import travel_times, MINUTES_PER_DAY
+from ways.graph import Link, Link_traffic_params
+from problems import MapProblem, TimeDependentMapProblem
+from heuristics import L2DistanceHeuristic, TravelTimeHeuristic
+from path import Path
+import numpy as np
+import time
+
+SOURCE, TARGET = 0, 2999
+DEPARTURES = [3 * 60, 8 * 60, 12 * 60, 17 * 60]
+
+roads = load_map_from_csv(Consts.getDataFilePath("israel.csv"))
+travelTimes = travel_times(roads)
+linksNum = len(travelTimes.distances)
+
+# The vectorized speeds are the speeds of link_speed_history, for the links built from the same compact link arrays
+# the link ids address
+rng = np.random.RandomState(Consts.SEED)
+compact = travelTimes.roads
+sample = rng.randint(linksNum, size=1000)
+minutes = rng.uniform(0, 2 * MINUTES_PER_DAY, size=len(sample))
+sources = compact.ids[np.searchsorted(compact.offsets, sample, side='right') - 1]
+links = [Link(int(s), int(compact.ids[compact.target_positions[i]]), int(compact.distances[i]),
+              int(compact.highway_types[i]), Link_traffic_params(compact.cos_frequencies[i], compact.sin_frequencies[i]))
+         for s, i in zip(sources, sample)]
+expected = [roads.link_speed_history(link, m) for link, m in zip(links, minutes)]
+print("Speeds match link_speed_history:", np.allclose(travelTimes.speeds(sample, minutes), expected))
+
+# FIFO: leaving later never means arriving earlier
+departures = np.arange(0, MINUTES_PER_DAY, 0.25)
+arrivals = departures[None, :] + travelTimes.travel_time(sample[:, None], departures[None, :])
+print("FIFO holds:", bool(np.all(np.diff(arrivals, axis=1) >= -1e-9)))
+
+start = time.time()
+travelTimes.travel_time(np.arange(linksNum), 8 * 60)
+print("Travel times of all {} links: {:.3f}sec".format(linksNum, time.time() - start))
+
+_, distance, _, _ = AStar(L2DistanceHeuristic()).run(MapProblem(roads, SOURCE, TARGET))
+print("Shortest route: {:.2f}km".format(distance / 1000))
+
+astar = AStar(TravelTimeHeuristic())
+for departure in DEPARTURES:
+    path, minutesTaken, _, developed = astar.run(TimeDependentMapProblem(roads, SOURCE, TARGET, departure))
+    length = Path(roads, [s.junctionIdx for s in path]).getDistance()
+    print("Leaving at {:02d}:{:02d}: {:.1f} minutes over {:.2f}km, developed: {} states".format(
+        departure // 60, departure % 60, minutesTaken, length / 1000, developed))
@@ -0,0 +1,36 @@
+##########################################
+# Checks that ActualDistanceCost gives a pair with no path
+# between its junctions the same cost (np.inf) in compute
+# and in computeMatrix, on a tiny map of one-way links:
+# 0 -> 1 and 2 -> 3, so there is no path from 0 to 3.
+##########################################
+from astar import AStar
+from heuristics import L2DistanceHeuristic
+from costs.actualDistanceCost import ActualDistanceCost
+from states import MapState
+from ways.graph import Junction, Link, Link_traffic_params, Roads
+from ways import tools
+import numpy as np
+
+COORDINATES = [(32.0, 34.8), (32.001, 34.8), (32.002, 34.8), (32.003, 34.8)]
+ONE_WAY_LINKS = [(0, 1), (2, 3)]
+
+
+def link(source, target):
+    distance = int(tools.compute_distance(COORDINATES[source], COORDINATES[target]))
+    return Link(source, target, distance, 0, Link_traffic_params(*tools.generate_traffic_noise_params(source, target)))
+
+
+roads = Roads({i: Junction(i, lat, lon, [link(s, t) for s, t in ONE_WAY_LINKS if s == i])
+               for i, (lat, lon) in enumerate(COORDINATES)})
+states = [MapState(i, roads[i].coordinates) for i in roads]
+metric = ActualDistanceCost(roads, AStar(L2DistanceHeuristic()))
+
+pairwise = np.array([[metric.compute(s, t) for t in states] for s in states])
+bulk = metric.computeMatrix(states)
+
+ok = np.array_equal(pairwise, bulk) and pairwise[0, 3] == np.inf
+print("compute:\n{}\ncomputeMatrix:\n{}\n{}".format(pairwise, bulk, "OK" if ok else "FAILED"))
+
+if not ok:
+    raise SystemExit(1)
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+import abc
+import pickle
+import sqlite3
+
+# Caches for search results (see AStar). Every cache has get(key) / put(key, value) and counts its hits, misses
+# and evictions, so it can be sized from real runs.
+class SearchCache(metaclass=abc.ABCMeta):
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    @abc.abstractmethod
+    def get(self, key):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put(self, key, value):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+# An in-memory cache that evicts the least recently used entry once it holds maxSize entries (None for no bound)
+class LRUCache(SearchCache):
+    maxSize = None
+    _entries = None
+
+    def __init__(self, maxSize=None):
+        self.maxSize = maxSize
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        value = self._entries.get(key)
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        while self.maxSize is not None and len(self._entries) > self.maxSize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# An on-disk cache in an sqlite file, which keeps the results between runs.
+# Only keys that are stable between processes (tuples of numbers and strings) are stored, others are ignored.
+class SqliteCache(SearchCache):
+    _connection = None
+
+    def __init__(self, filePath):
+        self._connection = sqlite3.connect(filePath)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)")
+
+    @staticmethod
+    def _diskKey(key):
+        return repr(key) if SqliteCache._isStable(key) else None
+
+    @staticmethod
+    def _isStable(key):
+        if isinstance(key, tuple):
+            return all(SqliteCache._isStable(k) for k in key)
+
+        return key is None or isinstance(key, (bool, int, float, str))
+
+    def get(self, key):
+        diskKey = self._diskKey(key)
+        row = None if diskKey is None else \
+            self._connection.execute("SELECT value FROM results WHERE key = ?", (diskKey,)).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        diskKey = self._diskKey(key)
+
+        if diskKey is not None:
+            with self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?)",
+                                         (diskKey, pickle.dumps(value)))
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+
+# A memory tier in front of a disk tier. Disk hits are promoted to the memory tier
+class TieredCache(SearchCache):
+    memory = None
+    disk = None
+
+    def __init__(self, memory, disk):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key):
+        value = self.memory.get(key)
+
+        if value is None:
+            value = self.disk.get(key)
+
+            if value is not None:
+                self.memory.put(key, value)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        self.disk.put(key, value)
+
+    def stats(self):
+        return dict(super().stats(), evictions=self.memory.evictions,
+                    memory=self.memory.stats(), disk=self.disk.stats())
@@ -1,6 +1,8 @@
 import abc
 
 class State(metaclass=abc.ABCMeta):
+    __slots__ = ()
+
     def __init__(self):
         pass
 
@@ -18,28 +20,128 @@ class MapState(State):
     def __eq__(self, other):
         return self.junctionIdx == other.junctionIdx
 
+# A map state reached at a given time (in minutes, see ways.traffic). It equals the MapState of the same junction,
+# so a search keeps one state per junction - the one reached earliest
+class TimedMapState(MapState):
+    time = None
+
+    def __init__(self, currentLoc, coordinates, time):
+        super().__init__(currentLoc, coordinates)
+        self.time = time
+
+# Gives every order of a bus problem a bit, so a set of orders is a single int.
+# Built once per problem and shared by all of its states.
+class OrderTable:
+    __slots__ = ('orders', 'allMask', '_pickupMasks', '_dropoffMasks', '_bitsOfOrder')
+
+    def __init__(self, orders):
+        self.orders = []
+        self.allMask = 0
+
+        # The orders picked up / dropped off at every location, and the bits of every order (orders may repeat)
+        self._pickupMasks = {}
+        self._dropoffMasks = {}
+        self._bitsOfOrder = {}
+        for order in orders:
+            self.append(order)
+
+    # Give a new order the next bit. The bits of the existing orders do not change, so masks built before stay valid
+    # (but the table's hash does, since it is the hash of the orders). Returns the bit of the order
+    def append(self, order):
+        i = len(self.orders)
+        self.orders.append(order)
+        self.allMask |= 1 << i
+
+        self._pickupMasks[order[0]] = self._pickupMasks.get(order[0], 0) | (1 << i)
+        self._dropoffMasks[order[1]] = self._dropoffMasks.get(order[1], 0) | (1 << i)
+        self._bitsOfOrder.setdefault(order, []).append(i)
+        return i
+
+    def __eq__(self, other):
+        return self is other or self.orders == other.orders
+
+    def __hash__(self):
+        return hash(tuple(self.orders))
+
+    def pickupsAt(self, junctionIdx):
+        return self._pickupMasks.get(junctionIdx, 0)
+
+    def dropoffsAt(self, junctionIdx):
+        return self._dropoffMasks.get(junctionIdx, 0)
+
+    # Returns the mask of the given orders
+    def encode(self, orders):
+        mask = 0
+
+        for order in orders:
+            # A repeated order takes the next bit of that order that is still free
+            bit = next(i for i in self._bitsOfOrder[order] if not mask & (1 << i))
+            mask |= 1 << bit
+
+        return mask
+
+    # Returns the list of orders in a mask
+    def decode(self, mask):
+        orders = []
+
+        while mask:
+            lowest = mask & -mask
+            orders.append(self.orders[lowest.bit_length() - 1])
+            mask ^= lowest
+
+        return orders
+
 class BusState(State):
-    junctionIdx = None
-    waitingOrders = None
-    ordersOnBus = None
-    finishedOrders = None
+    # The waiting orders and the orders on the bus are masks over the orders of orderTable.
+    # The finished orders are all the others.
+    __slots__ = ('junctionIdx', 'waitingMask', 'onBusMask', 'orderTable', '_hash')
 
-    def __init__(self, currentLoc:int, waitingOrders:list, ordersOnBus:list, finishedOrders:list):
+    # A state built from lists of orders gets an order table of its own. BusProblem.expand re-encodes such
+    # states into the table of the problem
+    def __init__(self, currentLoc:int, waitingOrders:list, ordersOnBus:list, finishedOrders:list, orderTable=None):
         super().__init__()
+        if orderTable is None:
+            orderTable = OrderTable(list(waitingOrders) + list(ordersOnBus) + list(finishedOrders))
+
+        self._setFields(currentLoc, orderTable.encode(waitingOrders), orderTable.encode(ordersOnBus), orderTable)
+
+    # The fast way to create a state, without going through lists of orders
+    @staticmethod
+    def fromMasks(orderTable, currentLoc:int, waitingMask:int, onBusMask:int):
+        state = BusState.__new__(BusState)
+        state._setFields(currentLoc, waitingMask, onBusMask, orderTable)
+        return state
+
+    def _setFields(self, currentLoc, waitingMask, onBusMask, orderTable):
         self.junctionIdx = currentLoc
-        self.waitingOrders = waitingOrders
-        self.ordersOnBus = ordersOnBus
-        self.finishedOrders = finishedOrders
+        self.waitingMask = waitingMask
+        self.onBusMask = onBusMask
+        self.orderTable = orderTable
+        self._hash = hash((currentLoc, waitingMask, onBusMask))
+
+    @property
+    def finishedMask(self):
+        return self.orderTable.allMask & ~(self.waitingMask | self.onBusMask)
+
+    @property
+    def waitingOrders(self):
+        return self.orderTable.decode(self.waitingMask)
+
+    @property
+    def ordersOnBus(self):
+        return self.orderTable.decode(self.onBusMask)
+
+    @property
+    def finishedOrders(self):
+        return self.orderTable.decode(self.finishedMask)
 
     def __hash__(self):
-        # Two lists are enough to know all three
-        return hash((self.junctionIdx, tuple(set(self.waitingOrders)), tuple(set(self.ordersOnBus))))
+        return self._hash
 
     def __eq__(self, other):
-        # Two lists are enough to know all three
-        return ((self.junctionIdx, self.waitingOrders, self.ordersOnBus) ==
-                (other.junctionIdx, other.waitingOrders, other.ordersOnBus))
+        # The masks are enough to know all three lists
+        return (self.junctionIdx, self.waitingMask, self.onBusMask) == \
+               (other.junctionIdx, other.waitingMask, other.onBusMask) and self.orderTable == other.orderTable
 
     def isGoal(self):
-        # TODO : Implement - V
-        return self.waitingOrders==[] and self.ordersOnBus==[] 
\ No newline at end of file
+        return self.waitingMask == 0 and self.onBusMask == 0
@@ -1,6 +1,8 @@
 'lists the functions you will need and what you can import with "from ways import"'
 from .graph import load_map_from_csv
+from .compact import load_compact_map_from_csv, CompactRoads
+from .storage import load_cached_map
+from .region import load_region_from_csv
 from .tools import compute_distance
 
-__all__ = ['load_map_from_csv', 'compute_distance']
-#
+__all__ = ['load_map_from_csv', 'load_compact_map_from_csv', 'load_cached_map', 'load_region_from_csv', 'CompactRoads', 'compute_distance']
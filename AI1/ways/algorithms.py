@@ -0,0 +1,170 @@
+'''
+ Whole-graph algorithms over `CompactRoads`.
+ Junctions are addressed by their position in roads.ids (see CompactRoads.position).
+'''
+
+import numpy as np
+
+from .compact import CompactRoads, as_compact
+
+
+def sparse_graph(roads, reverse=False):
+    '''returns the graph as a scipy CSR matrix of link distances
+    (rows are sources, columns are targets; reversed with reverse=True).
+    Of parallel links only the shortest is kept. The matrices are kept on the roads.'''
+    from scipy.sparse import csr_matrix
+
+    roads = as_compact(roads)
+    if getattr(roads, '_sparse_graphs', None) is None:
+        n = len(roads.ids)
+        sources = np.repeat(np.arange(n), np.diff(roads.offsets))
+        targets = roads.target_positions.astype(np.int64)
+        distances = roads.distances.astype(np.float64)
+
+        # csr_matrix sums duplicate entries, so keep only the shortest of every group of parallel links
+        order = np.lexsort((distances, targets, sources))
+        sources, targets, distances = sources[order], targets[order], distances[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+
+        forward = csr_matrix((distances[first], (sources[first], targets[first])), shape=(n, n))
+        roads._sparse_graphs = (forward, forward.T.tocsr())
+    return roads._sparse_graphs[1 if reverse else 0]
+
+
+'Flags of a strongly connected component in CompactRoads.scc_flags'
+SCC_HAS_ENTERING = 1
+SCC_HAS_LEAVING = 2
+
+
+def strongly_connected_components(roads):
+    '''labels the strongly and weakly connected components of the graph, and keeps the labels on the roads
+    (CompactRoads.scc_labels and wcc_labels, per junction position, and CompactRoads.scc_flags, per strong component).
+    The strong labels are in topological order: every link between two components goes from a lower label to a
+    higher one. For a `Roads` dictionary this builds (and keeps) its `CompactRoads`, so the labeling is only done
+    on request (load_cached_map loads the labels from the map cache); the checks below never label a map themselves.
+    Returns the strong labels'''
+    from scipy.sparse.csgraph import connected_components
+
+    roads = as_compact(roads)
+    if roads.scc_labels is None:
+        graph = sparse_graph(roads)
+        components_num, labels = connected_components(graph, directed=True, connection='strong')
+        sources = labels[np.repeat(np.arange(len(roads.ids)), np.diff(roads.offsets))]
+        targets = labels[roads.target_positions]
+        crossing = sources != targets
+        sources, targets = sources[crossing], targets[crossing]
+
+        # Relabel the components in the topological order of the condensed graph (Kahn's algorithm)
+        order = np.argsort(sources, kind='stable')
+        successors = np.split(targets[order], np.searchsorted(sources[order], np.arange(1, components_num)))
+        entering = np.bincount(targets, minlength=components_num)
+        ready = np.flatnonzero(entering == 0).tolist()
+        topological = np.empty(components_num, dtype=np.int64)
+        label = 0
+        while ready:
+            component = ready.pop()
+            topological[component] = label
+            label += 1
+            for successor in successors[component].tolist():
+                entering[successor] -= 1
+                if entering[successor] == 0:
+                    ready.append(successor)
+
+        flags = np.zeros(components_num, dtype=np.int8)
+        flags[topological[targets]] |= SCC_HAS_ENTERING
+        flags[topological[sources]] |= SCC_HAS_LEAVING
+        roads.wcc_labels = connected_components(graph, directed=True, connection='weak')[1].astype(np.int32)
+        roads.scc_labels = topological[labels].astype(np.int32)
+        roads.scc_flags = flags
+    return roads.scc_labels
+
+
+def labeled_roads(roads):
+    '''returns the `CompactRoads` of `roads` if its components are labeled (see strongly_connected_components),
+    and None otherwise. Never builds anything'''
+    compact = roads if isinstance(roads, CompactRoads) else getattr(roads, '_compact', None)
+    return compact if compact is not None and compact.scc_labels is not None else None
+
+
+def _unreachable(compact, sources, targets):
+    'The check of unreachable_pairs, for positions (ints, or arrays broadcast together). For local use only'
+    strong_sources, strong_targets = compact.scc_labels[sources], compact.scc_labels[targets]
+    flags = compact.scc_flags
+    return (compact.wcc_labels[sources] != compact.wcc_labels[targets]) | \
+        ((strong_sources != strong_targets) & ((strong_sources > strong_targets) |
+                                               ((flags[strong_targets] & SCC_HAS_ENTERING) == 0) |
+                                               ((flags[strong_sources] & SCC_HAS_LEAVING) == 0)))
+
+
+def unreachable_pairs(roads, source_positions, target_positions):
+    '''proves in O(1) per pair, by the components of the junctions, that there is no path from a source to a target
+    (positions, not junction indices). Returns a len(source_positions) x len(target_positions) boolean array,
+    all False when the components of the map are not labeled.
+    The check is partial: True is a proof, False is not. There is no path between different weakly connected
+    components, nor between different strongly connected components when the target's comes first in the topological
+    order, has no entering links, or the source's has no leaving links. Other pairs of different strongly connected
+    components in the same weakly connected one may still have no path between them, and only a search tells'''
+    compact = labeled_roads(roads)
+    sources = np.asarray(source_positions, dtype=np.intp)[:, np.newaxis]
+    targets = np.asarray(target_positions, dtype=np.intp)[np.newaxis, :]
+    if compact is None:
+        return np.zeros((sources.shape[0], targets.shape[1]), dtype=bool)
+    return _unreachable(compact, sources, targets)
+
+
+def is_unreachable(roads, source, target):
+    '''unreachable_pairs for one pair of junctions (indices, not positions): True proves there is no path from
+    `source` to `target`. False when the components of the map are not labeled'''
+    compact = labeled_roads(roads)
+    if compact is None:
+        return False
+    return bool(_unreachable(compact, compact.position(source), compact.position(target)))
+
+
+def shortest_distances(roads, source_positions, reverse=False, limit=np.inf):
+    '''runs Dijkstra from every one of source_positions and returns a
+    len(source_positions) x len(roads) array of distances (np.inf where unreachable or beyond limit).
+    With reverse=True the distances are *to* the sources instead of from them.'''
+    from scipy.sparse.csgraph import dijkstra
+
+    return dijkstra(sparse_graph(roads, reverse), directed=True, indices=np.asarray(source_positions),
+                    limit=limit)
+
+
+def distances_to_targets(roads, source, targets, reverse=False):
+    '''runs a Dijkstra from position `source` that stops as soon as all of `targets`
+    (positions) are settled. Returns a dict target -> distance (np.inf if unreachable).
+    With reverse=True the search runs over the reversed links, and the distances are *from* the targets to `source`.'''
+    import heapq
+
+    roads = as_compact(roads)
+    if reverse:
+        graph = sparse_graph(roads, reverse=True)
+        offsets, target_positions, distances = graph.indptr, graph.indices, graph.data
+    else:
+        offsets, target_positions, distances = roads.offsets, roads.target_positions, roads.distances
+
+    pending = set(targets)
+    result = {}
+    dist = {source: 0}
+    heap = [(0, source)]
+    inf = np.inf
+
+    while heap and pending:
+        d, x = heapq.heappop(heap)
+        if d > dist[x]:
+            continue
+
+        if x in pending:
+            result[x] = d
+            pending.remove(x)
+
+        start, end = offsets[x], offsets[x + 1]
+        for y, l in zip(target_positions[start:end].tolist(), distances[start:end].tolist()):
+            if d + l < dist.get(y, inf):
+                dist[y] = d + l
+                heapq.heappush(heap, (d + l, y))
+
+    result.update((t, inf) for t in pending)
+    return result
@@ -0,0 +1,327 @@
+'''
+ A compact, array-backed version of the road map.
+ The links are kept in compressed sparse row (CSR) form: the links leaving
+ the junction in position p are links offsets[p]:offsets[p+1] of the link arrays.
+'''
+
+from array import array
+import sys
+
+import numpy as np
+
+from .graph import Link, Link_traffic_params, Roads, graph_fingerprint, _parse_links
+from . import tools
+
+
+class CompactJunction:
+    '''A read-only view of one junction of `CompactRoads`.
+    Has the same fields as `Junction`, but `links` is built on access.'''
+    __slots__ = ('_roads', '_pos', 'index', 'lat', 'lon', 'coordinates')
+
+    def __init__(self, roads, pos):
+        self._roads = roads
+        self._pos = pos
+        self.index = int(roads.ids[pos])
+        self.lat = float(roads.lat[pos])
+        self.lon = float(roads.lon[pos])
+        self.coordinates = (self.lat, self.lon)
+
+    @property
+    def links(self):
+        return self._roads._links_at(self._pos)
+
+
+class CompactRoads:
+    '''The graph as flat NumPy arrays, with the read API of `Roads`:
+    roads[15] is (a view of) the junction whose index is 15, and
+    iterlinks(), junctions(), keys(), items(), etc. work as they do on `Roads`.
+
+    The per-junction arrays (ids, lat, lon) are sorted by junction index.
+    The per-link arrays (target_positions, distances, highway_types,
+    cos_frequencies, sin_frequencies) are grouped by source junction, and
+    target_positions holds positions in `ids`, not junction indices.
+    '''
+
+    'The cache directory the arrays are memory-mapped from (see ways.storage), or None'
+    mapped_path = None
+
+    'The reverse adjacency (links grouped by target), built on the first call to reverse_links'
+    reverse_offsets = None
+    reverse_link_ids = None
+    link_sources = None
+
+    '''The strongly and weakly connected component of every junction (by position) and the flags of every strong
+    component, see algorithms.strongly_connected_components. Kept in the map cache'''
+    scc_labels = None
+    scc_flags = None
+    wcc_labels = None
+
+    'The links of the junctions looked up by link(), by source position'
+    _link_index = None
+
+    'The hash of the graph, computed by the first call to fingerprint'
+    _fingerprint = None
+
+    'The names of the arrays that make up the graph, in constructor order'
+    ARRAYS = ('ids', 'lat', 'lon', 'offsets', 'target_positions', 'distances', 'highway_types',
+              'cos_frequencies', 'sin_frequencies')
+
+    def __init__(self, ids, lat, lon, offsets, target_positions, distances, highway_types,
+                 cos_frequencies, sin_frequencies):
+        self.ids = ids
+        self.lat = lat
+        self.lon = lon
+        self.offsets = offsets
+        self.target_positions = target_positions
+        self.distances = distances
+        self.highway_types = highway_types
+        self.cos_frequencies = cos_frequencies
+        self.sin_frequencies = sin_frequencies
+
+        # When the indices are a contiguous range (the common case) a position is just an offset
+        self._base = int(ids[0]) if len(ids) > 0 else 0
+        self._contiguous = len(ids) == 0 or int(ids[-1]) - self._base + 1 == len(ids)
+
+        'to change the generation, simply assign to it'
+        self.generation = 0
+        self.base_traffic = tools.base_traffic_pattern()
+        self.mean_lat_lon = (sum(lat.tolist()) / len(lat), sum(lon.tolist()) / len(lon))
+        self._link_index = {}
+
+    @classmethod
+    def from_roads(cls, roads):
+        '''builds the compact graph from a `Roads` dictionary'''
+        builder = _CSRBuilder()
+        for j in sorted(roads.keys()):
+            junction = roads[j]
+            builder.add_junction(j, junction.lat, junction.lon,
+                                 [(lnk.target, lnk.distance, lnk.highway_type,
+                                   lnk.link_params.cos_frequency, lnk.link_params.sin_frequency)
+                                  for lnk in junction.links])
+        return builder.build()
+
+    def __reduce_ex__(self, protocol):
+        # Memory-mapped roads are pickled by reference, so other processes map the same file
+        if self.mapped_path is not None:
+            from .storage import load_compact_map
+            return load_compact_map, (self.mapped_path, True)
+        return super().__reduce_ex__(protocol)
+
+    def position(self, idx):
+        '''returns the position of junction `idx` in the junction arrays'''
+        if self._contiguous:
+            pos = idx - self._base
+            if 0 <= pos < len(self.ids):
+                return int(pos)
+        else:
+            pos = int(np.searchsorted(self.ids, idx))
+            if pos < len(self.ids) and self.ids[pos] == idx:
+                return pos
+        raise KeyError(idx)
+
+    def _links_at(self, pos):
+        start, end = self.offsets[pos], self.offsets[pos + 1]
+        source = int(self.ids[pos])
+        return [Link(source, target, distance, highway_type, Link_traffic_params(cos_frequency, sin_frequency))
+                for target, distance, highway_type, cos_frequency, sin_frequency in
+                zip(self.ids[self.target_positions[start:end]].tolist(),
+                    self.distances[start:end].tolist(),
+                    self.highway_types[start:end].tolist(),
+                    self.cos_frequencies[start:end].tolist(),
+                    self.sin_frequencies[start:end].tolist())]
+
+    def link(self, source, target):
+        '''returns the link from junction `source` to junction `target` (the first one, if there
+        are several), or None. The links of a junction are indexed on its first lookup.'''
+        pos = self.position(source)
+        links = self._link_index.get(pos)
+        if links is None:
+            links = {}
+            for lnk in self._links_at(pos):
+                links.setdefault(lnk.target, lnk)
+            self._link_index[pos] = links
+        return links.get(target)
+
+    def _build_reverse(self):
+        degrees = np.diff(self.offsets)
+        self.link_sources = np.repeat(np.arange(len(self.ids), dtype=np.int32), degrees)
+        self.reverse_link_ids = np.argsort(self.target_positions, kind='stable')
+        reverse_offsets = np.zeros(len(self.ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.target_positions, minlength=len(self.ids)), out=reverse_offsets[1:])
+        self.reverse_offsets = reverse_offsets
+
+    def reverse_links(self, idx):
+        '''returns the links entering junction `idx`.
+        The reverse adjacency is built on the first call.'''
+        if self.reverse_offsets is None:
+            self._build_reverse()
+        pos = self.position(idx)
+        link_ids = self.reverse_link_ids[self.reverse_offsets[pos]:self.reverse_offsets[pos + 1]]
+        return [Link(source, target, distance, highway_type, Link_traffic_params(cos_frequency, sin_frequency))
+                for source, target, distance, highway_type, cos_frequency, sin_frequency in
+                zip(self.ids[self.link_sources[link_ids]].tolist(),
+                    self.ids[self.target_positions[link_ids]].tolist(),
+                    self.distances[link_ids].tolist(),
+                    self.highway_types[link_ids].tolist(),
+                    self.cos_frequencies[link_ids].tolist(),
+                    self.sin_frequencies[link_ids].tolist())]
+
+    def __getitem__(self, idx):
+        return CompactJunction(self, self.position(idx))
+
+    def __contains__(self, idx):
+        try:
+            self.position(idx)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def get(self, idx, default=None):
+        return self[idx] if idx in self else default
+
+    def keys(self):
+        return self.ids.tolist()
+
+    def values(self):
+        return (CompactJunction(self, pos) for pos in range(len(self.ids)))
+
+    def items(self):
+        return ((junction.index, junction) for junction in self.values())
+
+    def junctions(self):
+        return list(self.values())
+
+    def return_focus(self, start):
+        return Roads.return_focus(self, start)
+
+    def link_speed(self, link):
+        return Roads.link_speed(self, link)
+
+    def link_speed_history(self, link, time):
+        return Roads.link_speed_history(self, link, time)
+
+    def realtime_link_speed(self, link):
+        return Roads.realtime_link_speed(self, link)
+
+    def iterlinks(self):
+        '''chain all the links in the graph.
+        use: for link in roads.iterlinks(): ... '''
+        return (link for pos in range(len(self.ids)) for link in self._links_at(pos))
+
+    def fingerprint(self):
+        '''a hash of the junctions and of the targets and distances of their links, see Roads.fingerprint'''
+        if self._fingerprint is None:
+            sources = np.repeat(self.ids, np.diff(self.offsets))
+            self._fingerprint = graph_fingerprint(self.ids, sources, self.ids[self.target_positions], self.distances)
+        return self._fingerprint
+
+    def nbytes(self):
+        '''the memory held by the graph arrays, in bytes'''
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+
+class _CSRBuilder:
+    'Accumulates junctions and links in typed buffers. This class is for local use only'
+
+    def __init__(self, with_noise_params=True):
+        # Without noise params, the links are (target, distance, highway_type), and build computes the params
+        # of all of them in one vectorized pass
+        self.with_noise_params = with_noise_params
+        self.ids, self.lat, self.lon = array('q'), array('d'), array('d')
+        self.degrees = array('q')
+        self.targets, self.distances, self.highway_types = array('q'), array('q'), array('b')
+        self.cos_frequencies, self.sin_frequencies = array('d'), array('d')
+
+    def add_junction(self, index, lat, lon, links):
+        '''links is a list of (target, distance, highway_type, cos_frequency, sin_frequency),
+        or of (target, distance, highway_type) if the builder is without noise params'''
+        self.ids.append(index)
+        self.lat.append(lat)
+        self.lon.append(lon)
+        self.degrees.append(len(links))
+        if not self.with_noise_params:
+            for target, distance, highway_type in links:
+                self.targets.append(target)
+                self.distances.append(distance)
+                self.highway_types.append(highway_type)
+            return
+        for target, distance, highway_type, cos_frequency, sin_frequency in links:
+            self.targets.append(target)
+            self.distances.append(distance)
+            self.highway_types.append(highway_type)
+            self.cos_frequencies.append(cos_frequency)
+            self.sin_frequencies.append(sin_frequency)
+
+    def build(self):
+        ids = np.frombuffer(self.ids, dtype=np.int64)
+        degrees = np.frombuffer(self.degrees, dtype=np.int64)
+        targets = np.frombuffer(self.targets, dtype=np.int64)
+        if self.with_noise_params:
+            noise_params = [np.frombuffer(self.cos_frequencies, dtype=np.float64).copy(),
+                            np.frombuffer(self.sin_frequencies, dtype=np.float64).copy()]
+        else:
+            noise_params = list(tools.generate_traffic_noise_params_array(np.repeat(ids, degrees), targets))
+        link_arrays = [np.frombuffer(self.distances, dtype=np.int64).astype(np.int32),
+                       np.frombuffer(self.highway_types, dtype=np.int8).copy()] + noise_params
+
+        # Sort the junctions by index (keeping every junction's links together)
+        order = np.argsort(ids, kind='stable')
+        if np.any(order != np.arange(len(ids))):
+            starts = np.concatenate(([0], np.cumsum(degrees)[:-1]))
+            link_order = np.concatenate([np.arange(starts[p], starts[p] + degrees[p]) for p in order]
+                                        + [np.zeros(0, dtype=np.int64)])
+            ids, degrees = ids[order], degrees[order]
+            targets = targets[link_order]
+            link_arrays = [a[link_order] for a in link_arrays]
+
+        # Translate the targets to positions, dropping links to junctions that were not loaded
+        target_positions = np.searchsorted(ids, targets)
+        valid = target_positions < len(ids)
+        valid[valid] = ids[target_positions[valid]] == targets[valid]
+        if not np.all(valid):
+            sources = np.repeat(np.arange(len(ids)), degrees)
+            degrees = np.bincount(sources[valid], minlength=len(ids))
+            target_positions = target_positions[valid]
+            link_arrays = [a[valid] for a in link_arrays]
+
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=offsets[1:])
+
+        return CompactRoads(ids.copy(), np.frombuffer(self.lat, dtype=np.float64)[order],
+                            np.frombuffer(self.lon, dtype=np.float64)[order], offsets,
+                            target_positions.astype(np.int32), *link_arrays)
+
+
+def as_compact(roads):
+    '''returns `roads` as `CompactRoads`. A `Roads` dictionary is converted once,
+    and the conversion is kept on it for the next calls'''
+    if isinstance(roads, CompactRoads):
+        return roads
+    if getattr(roads, '_compact', None) is None:
+        roads._compact = CompactRoads.from_roads(roads)
+    return roads._compact
+
+
+@tools.timed
+def load_compact_map_from_csv(filename, start=0, count=sys.maxsize):
+    '''returns the graph as `CompactRoads`, without building a `Junction`
+    and a list of `Link`s per junction.
+    The parameters are the same as in load_map_from_csv.
+    Links to junctions outside the loaded part of the file are dropped.
+    '''
+
+    import csv
+    from itertools import islice
+    builder = _CSRBuilder(with_noise_params=False)
+    with open(filename, 'rt') as f:
+        it = islice(f, start, min(start + count, sys.maxsize))
+        for row in csv.reader(it):
+            i = int(row[0])
+            builder.add_junction(i, float(row[1]), float(row[2]), _parse_links(i, row[3:]))
+    return builder.build()
@@ -0,0 +1,102 @@
+'''
+ Fast versions of tools.compute_distance, which stays as the reference.
+ Points are (lat, lon) in degrees, distances are in Meters on the same sphere.
+
+ method='haversine' (the default) is exact on the sphere, and unlike the
+ arccos formula of compute_distance it keeps its precision for short distances.
+ method='equirectangular' projects every pair on a plane around its mean
+ latitude. It is cheaper, and at Israel's latitudes and distances it is
+ within 0.1% of the sphere.
+
+ The special cases of compute_distance are kept: identical points are 0.0
+ apart, and points closer than 0.00001 degrees are 0.001 apart.
+'''
+
+from math import asin, cos, radians, sin, sqrt, pi
+
+import numpy as np
+
+EARTH_RADIUS = 40000 / (2 * pi) * 1000
+
+METHODS = ('haversine', 'equirectangular')
+
+
+def distance(pnt1, pnt2, method='haversine'):
+    '''the distance between two points, with plain floats (no NumPy scalars)'''
+    lat1, lon1 = pnt1
+    lat2, lon2 = pnt2
+
+    if (lat1, lon1) == (lat2, lon2):
+        return 0.0
+    if max(abs(lat1 - lat2), abs(lon1 - lon2)) < 0.00001:
+        return 0.001
+
+    if method == 'equirectangular':
+        x = radians(lon2 - lon1) * cos(radians(lat1 + lat2) / 2)
+        return sqrt(x * x + radians(lat2 - lat1) ** 2) * EARTH_RADIUS
+    if method != 'haversine':
+        raise ValueError('unknown method {!r}, expected one of {}'.format(method, METHODS))
+
+    a = sin(radians(lat2 - lat1) / 2) ** 2 + \
+        cos(radians(lat1)) * cos(radians(lat2)) * sin(radians(lon2 - lon1) / 2) ** 2
+    return 2 * asin(sqrt(min(a, 1.0))) * EARTH_RADIUS
+
+
+def _as_points(pnts):
+    return np.asarray(pnts, dtype=float).reshape(-1, 2)
+
+
+def _half_angles(degrees):
+    half = np.radians(degrees) / 2
+    return np.sin(half), np.cos(half)
+
+
+def _distances(lat1, lon1, lat2, lon2, method):
+    '''The distances between broadcast arrays of coordinates. This function is for local use only.
+    The sines and cosines are taken per point, and combined per pair with the angle sum identities,
+    so the cost per pair is a few multiplications (the arcsin aside)'''
+    sin_lat1, cos_lat1 = _half_angles(lat1)
+    sin_lat2, cos_lat2 = _half_angles(lat2)
+
+    if method == 'equirectangular':
+        # cos((lat1 + lat2) / 2), the cosine of the mean latitude
+        cos_mean_lat = cos_lat1 * cos_lat2 - sin_lat1 * sin_lat2
+        x = np.radians(lon2 - lon1) * cos_mean_lat
+        y = np.radians(lat2 - lat1)
+        distances = np.sqrt(x * x + y * y) * EARTH_RADIUS
+    elif method == 'haversine':
+        sin_lon1, cos_lon1 = _half_angles(lon1)
+        sin_lon2, cos_lon2 = _half_angles(lon2)
+        # sin((lat2 - lat1) / 2), sin((lon2 - lon1) / 2), and cos(lat1) * cos(lat2)
+        sin_dlat = sin_lat2 * cos_lat1 - cos_lat2 * sin_lat1
+        sin_dlon = sin_lon2 * cos_lon1 - cos_lon2 * sin_lon1
+        cos_lats = (cos_lat1 ** 2 - sin_lat1 ** 2) * (cos_lat2 ** 2 - sin_lat2 ** 2)
+        a = sin_dlat ** 2 + cos_lats * sin_dlon ** 2
+        distances = 2 * np.arcsin(np.sqrt(np.minimum(a, 1))) * EARTH_RADIUS
+    else:
+        raise ValueError('unknown method {!r}, expected one of {}'.format(method, METHODS))
+
+    delta = np.maximum(np.abs(lat2 - lat1), np.abs(lon2 - lon1))
+    distances[delta < 0.00001] = 0.001
+    distances[delta == 0] = 0.0
+    return distances
+
+
+def pairwise_distances(pnts1, pnts2, method='haversine'):
+    '''the distance between pnts1[i] and pnts2[i], for every i'''
+    pnts1, pnts2 = _as_points(pnts1), _as_points(pnts2)
+    return _distances(pnts1[:, 0], pnts1[:, 1], pnts2[:, 0], pnts2[:, 1], method)
+
+
+def distances_from(pnt, pnts, method='haversine'):
+    '''the distances from pnt to every point in pnts'''
+    pnts = _as_points(pnts)
+    return _distances(float(pnt[0]), float(pnt[1]), pnts[:, 0], pnts[:, 1], method)
+
+
+def distance_matrix(pnts1, pnts2=None, method='haversine'):
+    '''matrix[i, j] is the distance from pnts1[i] to pnts2[j].
+    Without pnts2, the (symmetric) matrix between the points of pnts1'''
+    pnts1 = _as_points(pnts1)
+    pnts2 = pnts1 if pnts2 is None else _as_points(pnts2)
+    return _distances(pnts1[:, 0, None], pnts1[:, 1, None], pnts2[None, :, 0], pnts2[None, :, 1], method)
@@ -4,9 +4,13 @@
 '''
 
 from collections import namedtuple
+import hashlib
 from . import tools
+from . import traffic
 import sys
 
+import numpy as np
+
 # define class Link_traffic_params
 # Some additional parameters for a link
 Link_traffic_params = namedtuple('Link_traffic_params',
@@ -53,6 +57,9 @@ class Roads(dict):
         self.base_traffic = tools.base_traffic_pattern()
         tmp = [(n.lat, n.lon) for n in junction_list.values()]
         self.mean_lat_lon = (sum([i[0] for i in tmp]) / len(tmp), sum([i[1] for i in tmp]) / len(tmp))
+        self._reverse_links = None
+        self._link_index = {}
+        self._fingerprint = None
 
 
     def return_focus(self, start):
@@ -68,27 +75,101 @@ class Roads(dict):
                 break
         return found
 
+    def link(self, source, target):
+        '''returns the link from junction `source` to junction `target` (the first one, if there
+        are several), or None. The links of a junction are indexed on its first lookup.'''
+        links = self._link_index.get(source)
+        if links is None:
+            links = {}
+            for lnk in self[source].links:
+                links.setdefault(lnk.target, lnk)
+            self._link_index[source] = links
+        return links.get(target)
+
+    def reverse_links(self, index):
+        '''returns the links entering junction `index`.
+        The reverse adjacency is built on the first call.'''
+        if self._reverse_links is None:
+            self._reverse_links = {}
+            for link in self.iterlinks():
+                self._reverse_links.setdefault(link.target, []).append(link)
+        return self._reverse_links.get(index, [])
+
     def iterlinks(self):
         '''chain all the links in the graph. 
         use: for link in roads.iterlinks(): ... '''
         return (link for j in self.values() for link in j.links)
 
+    def fingerprint(self):
+        '''a hash of the junctions and of the targets and distances of their links, which identifies the graph
+        for the caches that outlive a process. The same graph as `CompactRoads` has the same fingerprint.
+        Computed on the first call'''
+        if self._fingerprint is None:
+            ids = sorted(self.keys())
+            links = [(link.source, link.target, link.distance) for j in ids for link in self[j].links]
+            sources, targets, distances = zip(*links) if links else ((), (), ())
+            self._fingerprint = graph_fingerprint(ids, sources, targets, distances)
+        return self._fingerprint
+
+    def link_speed(self, link):
+        '''the speed of the link (in km/h) in the snapshot of the current generation'''
+        return self.link_speed_history(link, traffic.generation_minute(self.generation))
+
+    def link_speed_history(self, link, time):
+        '''the speed of the link (in km/h) at `time` (in minutes, accepts non-integers).
+        See ways.traffic for the model, and traffic.TravelTimes for the vectorized version'''
+        return traffic.link_speed_at(link, time, self.base_traffic)
+
+    def realtime_link_speed(self, link):
+        '''the speed of the link (in km/h) now'''
+        return self.link_speed_history(link, traffic.current_minute())
+
+
+def graph_fingerprint(ids, sources, targets, distances):
+    '''the hash of a graph given as its sorted junction indices, and the sources, targets and distances of its links
+    (grouped by source, in the order of the links of every junction)'''
+    sha1 = hashlib.sha1()
+    for values, dtype in [(ids, np.int64), (sources, np.int64), (targets, np.int64), (distances, np.float64)]:
+        sha1.update(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        sha1.update(b'|')
+    return sha1.hexdigest()
+
+
+def _parse_links(i, link_row):
+    'Returns the (target, distance, highway_type) of the links of junction i. This function is for local use only'
+    try:
+        links = []
+        for link_string in link_row:
+            target, distance, highway_type = [int(x) for x in link_string.split("@")]
+            links.append((target, distance, highway_type))
+        return [lnk for lnk in links if lnk[1] > 0]
+    except ValueError:
+        return []
 
-def _make_link(i, link_string):
-    'This function is for local use only'
-    link_params = [int(x) for x in link_string.split("@")]
-    return Link(i, *(link_params + [Link_traffic_params(*tools.generate_traffic_noise_params(i, link_params[0]))]))
 
+def _parse_rows(lines):
+    'Parses CSV lines into (index, lat, lon, links) rows. This function is for local use only'
+    import csv
+    return [(int(row[0]), float(row[1]), float(row[2]), _parse_links(int(row[0]), row[3:]))
+            for row in csv.reader(lines)]
 
-def _make_junction(i_str, lat_str, lon_str, *link_row):
-    'This function is for local use only'
-    i, lat, lon = int(i_str), float(lat_str), float(lon_str)
-    try:
-        links = [_make_link(i, lnk) for lnk in link_row]
-        links = list(filter(lambda lnk: lnk.distance > 0, links))
-    except ValueError:
-        links = []
-    return Junction(i, lat, lon, links)
+
+def _drop_dangling_links(rows):
+    'Keeps only the links between junctions of the rows. This function is for local use only'
+    ids = {row[0] for row in rows}
+    return [(i, lat, lon, [lnk for lnk in links if lnk[0] in ids]) for i, lat, lon, links in rows]
+
+
+def _make_junctions(rows):
+    'Builds the junctions of parsed rows. This function is for local use only'
+    # The traffic params of all the links are computed in one vectorized pass
+    sources = [i for i, _, _, links in rows for _ in links]
+    targets = [lnk[0] for _, _, _, links in rows for lnk in links]
+    cos_frequencies, sin_frequencies = tools.generate_traffic_noise_params_array(sources, targets)
+    params = map(Link_traffic_params, cos_frequencies.tolist(), sin_frequencies.tolist())
+    return {i: Junction(i, lat, lon, [Link(i, target, distance, highway_type, next(params))
+                                      for target, distance, highway_type in links])
+            for i, lat, lon, links in rows}
 
 
 @tools.timed
@@ -98,12 +179,10 @@ def load_map_from_csv(filename, start=0, count=sys.maxsize):
     example: load_map_from_csv(start=50000, count=50000))
     '''
 
-    import csv
     from itertools import islice
     with open(filename, 'rt') as f:
-        it = islice(f, start, min(start + count, sys.maxsize))
-        lst = {int(row[0]): _make_junction(*row) for row in csv.reader(it)}
-        if count < sys.maxsize:
-            lst = {i: Junction(i, j.lat, j.lon, [lnk for lnk in j.links if lnk.target in lst])
-                   for i, j in lst.items()}
-    return Roads(lst)
+        rows = _parse_rows(islice(f, start, min(start + count, sys.maxsize)))
+    # Links to junctions outside the slice are dropped before the junctions are built
+    if count < sys.maxsize:
+        rows = _drop_dangling_links(rows)
+    return Roads(_make_junctions(rows))
@@ -0,0 +1,19 @@
+'''
+ Information about the roads of the map.
+ Link.highway_type is an index into ROAD_TYPES (and SPEED_RANGES).
+'''
+
+ROAD_TYPES = ('motorway', 'motorway_link', 'trunk', 'trunk_link', 'primary', 'primary_link',
+              'secondary', 'secondary_link', 'tertiary', 'tertiary_link', 'unclassified',
+              'residential', 'living_street', 'service', 'road')
+
+'(min, max) speed of every road type, in km/h. The max speed is the speed of a free road'
+SPEED_RANGES = ((80, 110), (50, 80), (70, 90), (40, 70), (50, 80), (30, 60),
+                (40, 70), (30, 50), (30, 60), (20, 50), (20, 50),
+                (20, 50), (10, 30), (10, 30), (20, 50))
+
+'The highest speed on the map, in km/h (for optimistic travel time estimates)'
+MAX_SPEED = max(max_speed for _, max_speed in SPEED_RANGES)
+
+'How much the traffic noise of a link can slow it down, on top of the base traffic pattern'
+TRAFFIC_NOISE_AMPLITUDE = 0.2
@@ -0,0 +1,94 @@
+'''
+ Loading a geographic region of the map, instead of a range of lines.
+ The region is a bounding box, or the junctions within a radius of some seed
+ junctions (or both). It is found in the row index of the CSV (see
+ storage.load_row_index), which keeps the coordinates and the byte offset of
+ every row, sorted by latitude. Only the rows of the region are then read
+ from the CSV and parsed.
+'''
+
+from math import cos, degrees, radians
+
+import numpy as np
+
+from .distance import EARTH_RADIUS, distances_from
+from .graph import Roads, _parse_rows, _drop_dangling_links, _make_junctions
+from .storage import load_row_index
+from . import tools
+
+
+def _in_box(row_index, min_lat, min_lon, max_lat, max_lon):
+    'The rows in a box, found in the latitude slab of the box. This function is for local use only'
+    first = np.searchsorted(row_index['lat'], min_lat, side='left')
+    last = np.searchsorted(row_index['lat'], max_lat, side='right')
+    lon = row_index['lon'][first:last]
+    return first + np.flatnonzero((min_lon <= lon) & (lon <= max_lon))
+
+
+def seed_coordinates(row_index, seeds):
+    '''the (lat, lon) of the seed junctions, from the row index'''
+    seeds = np.array(list(seeds), dtype=np.int64).reshape(-1)
+    found = np.searchsorted(row_index['sorted_ids'], seeds)
+    missing = (found >= len(row_index['sorted_ids'])) | \
+        (row_index['sorted_ids'][np.minimum(found, len(row_index['sorted_ids']) - 1)] != seeds)
+    if np.any(missing):
+        raise ValueError('junctions {} are not in the map'.format(seeds[missing].tolist()))
+    rows = row_index['id_rows'][found]
+    return np.stack([row_index['lat'][rows], row_index['lon'][rows]], axis=-1)
+
+
+def region_rows(row_index, box=None, seeds=(), radius=0):
+    '''the positions (in the row index) of the rows in the region: inside box = (min_lat, min_lon, max_lat, max_lon),
+    or at most `radius` Meters from one of the seed junctions'''
+    found = [np.zeros(0, dtype=np.intp)]
+    if box is not None:
+        found.append(_in_box(row_index, *box))
+
+    # The box around every seed's circle, then the exact distances
+    margin_lat = degrees(radius / EARTH_RADIUS) * (1 + 1e-6)
+    for lat, lon in seed_coordinates(row_index, seeds):
+        margin_lon = margin_lat / max(cos(radians(lat)), 1e-6)
+        candidates = _in_box(row_index, lat - margin_lat, lon - margin_lon, lat + margin_lat, lon + margin_lon)
+        points = np.stack([row_index['lat'][candidates], row_index['lon'][candidates]], axis=-1)
+        found.append(candidates[distances_from((lat, lon), points) <= radius])
+
+    return np.unique(np.concatenate(found))
+
+
+def _read_rows(filename, offsets, lengths):
+    'The lines at the given byte offsets, in file order. This function is for local use only'
+    order = np.argsort(offsets)
+    offsets, ends = offsets[order], offsets[order] + lengths[order]
+
+    # Rows that follow each other in the file are read together
+    breaks = np.flatnonzero(offsets[1:] != ends[:-1]) + 1
+    lines = []
+    with open(filename, 'rb') as f:
+        for first, last in zip(np.concatenate(([0], breaks)), np.concatenate((breaks, [len(offsets)]))):
+            f.seek(offsets[first])
+            lines.extend(f.read(ends[last - 1] - offsets[first]).decode('utf-8').splitlines())
+    return lines
+
+
+@tools.timed
+def load_region_from_csv(filename, box=None, seeds=(), radius=0, compact=False):
+    '''returns the part of the graph in a region (see region_rows), as `Roads`,
+    or as `CompactRoads` with compact=True. Links that leave the region are dropped.
+    The row index of the CSV is built on the first call (one pass over the file, without parsing the links),
+    and later calls read only the rows of the region.
+    example: load_region_from_csv(filename, seeds=[375, 1478], radius=2000)
+    '''
+    row_index = load_row_index(filename)
+    positions = region_rows(row_index, box, seeds, radius)
+    if len(positions) == 0:
+        raise ValueError('there are no junctions in the region')
+    lines = _read_rows(filename, row_index['byte_offsets'][positions], row_index['byte_lengths'][positions])
+    rows = _drop_dangling_links(_parse_rows(lines))
+    if not compact:
+        return Roads(_make_junctions(rows))
+
+    from .compact import _CSRBuilder
+    builder = _CSRBuilder(with_noise_params=False)
+    for i, lat, lon, links in rows:
+        builder.add_junction(i, lat, lon, links)
+    return builder.build()
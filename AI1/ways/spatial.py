@@ -0,0 +1,118 @@
+'''
+ A spatial index of the junctions, for addressing the map by coordinates.
+ Points are (lat, lon) in degrees, distances are in Meters (see distance.py).
+
+ Nearest-neighbour and radius queries use a KD-tree over the junctions as 3D
+ points on the sphere. The straight (chord) distance between two such points
+ grows with the distance along the sphere, so the nearest by chord is the
+ nearest by haversine, exactly.
+ Bounding-box queries use a second KD-tree over the raw (lat, lon).
+'''
+
+import numpy as np
+
+from .distance import EARTH_RADIUS, pairwise_distances
+
+
+def _to_sphere(lat, lon):
+    'Points on the sphere as (x, y, z) Meters. This function is for local use only'
+    lat, lon = np.radians(lat), np.radians(lon)
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1) * EARTH_RADIUS
+
+
+def _chord(distance):
+    'The chord of an arc of `distance` Meters. This function is for local use only'
+    return 2 * EARTH_RADIUS * np.sin(np.minimum(distance / (2 * EARTH_RADIUS), np.pi / 2))
+
+
+class SpatialIndex:
+    '''Nearest-junction, k-nearest, radius and bounding-box queries over the junctions of
+    a `Roads` or a `CompactRoads`, in O(log n) per query (plus the size of the answer).
+    Every query has a batch form that takes an array of points, for snapping a whole
+    order file in one call.'''
+
+    def __init__(self, roads):
+        from scipy.spatial import cKDTree
+        from .compact import CompactRoads
+
+        if isinstance(roads, CompactRoads):
+            self.ids, self.lat, self.lon = roads.ids, roads.lat, roads.lon
+        else:
+            junctions = sorted(roads.values(), key=lambda j: j.index)
+            self.ids = np.array([j.index for j in junctions], dtype=np.int64)
+            self.lat = np.array([j.lat for j in junctions], dtype=np.float64)
+            self.lon = np.array([j.lon for j in junctions], dtype=np.float64)
+
+        self._tree = cKDTree(_to_sphere(self.lat, self.lon))
+        self._box_tree = cKDTree(np.stack([self.lat, self.lon], axis=-1))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, lat, lon):
+        '''returns (junction index, distance) of the junction nearest to (lat, lon)'''
+        ids, distances = self.snap([(lat, lon)])
+        return int(ids[0]), float(distances[0])
+
+    def k_nearest(self, lat, lon, k):
+        '''returns a list of (junction index, distance) of the k junctions nearest to (lat, lon),
+        nearest first (fewer if the map has fewer junctions)'''
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        _, positions = self._tree.query(_to_sphere(lat, lon), k=k)
+        positions = np.atleast_1d(positions)
+        distances = pairwise_distances(np.tile((lat, lon), (k, 1)), self._points(positions))
+        return list(zip(self.ids[positions].tolist(), distances.tolist()))
+
+    def snap(self, points):
+        '''the nearest junction to each of the (lat, lon) points.
+        Returns two arrays: the junction indices and the distances to them'''
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) == 0 or len(self) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        _, positions = self._tree.query(_to_sphere(points[:, 0], points[:, 1]))
+        return self.ids[positions], pairwise_distances(points, self._points(positions))
+
+    def snap_orders(self, orders):
+        '''snaps orders given as ((lat, lon), (lat, lon)) pairs, returns them as (source, target) junction pairs'''
+        if len(orders) == 0:
+            return []
+        ids, _ = self.snap(np.asarray(orders, dtype=np.float64).reshape(-1, 2))
+        return list(zip(ids[0::2].tolist(), ids[1::2].tolist()))
+
+    def within(self, lat, lon, radius):
+        '''the indices of the junctions at most `radius` Meters from (lat, lon), sorted'''
+        return self.within_many([(lat, lon)], radius)
+
+    def within_many(self, points, radius):
+        '''the indices of the junctions at most `radius` Meters from any of the points, sorted'''
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        found = self._tree.query_ball_point(_to_sphere(points[:, 0], points[:, 1]), _chord(radius))
+        positions = np.unique(np.concatenate([np.asarray(p, dtype=np.intp) for p in found] +
+                                             [np.zeros(0, dtype=np.intp)]))
+        return self.ids[positions]
+
+    def in_box(self, min_lat, min_lon, max_lat, max_lon):
+        '''the indices of the junctions with min_lat <= lat <= max_lat and min_lon <= lon <= max_lon, sorted'''
+        if min_lat > max_lat or min_lon > max_lon:
+            return np.zeros(0, dtype=np.int64)
+        # The smallest square around the box (with a margin for rounding), then the box itself
+        center = ((min_lat + max_lat) / 2, (min_lon + max_lon) / 2)
+        half_side = max(max_lat - min_lat, max_lon - min_lon) / 2 * (1 + 1e-9) + 1e-9
+        positions = np.sort(np.asarray(self._box_tree.query_ball_point(center, half_side, p=np.inf),
+                                       dtype=np.intp))
+        lat, lon = self.lat[positions], self.lon[positions]
+        inside = (min_lat <= lat) & (lat <= max_lat) & (min_lon <= lon) & (lon <= max_lon)
+        return self.ids[positions[inside]]
+
+    def _points(self, positions):
+        return np.stack([self.lat[positions], self.lon[positions]], axis=-1)
+
+
+def spatial_index(roads):
+    '''returns the `SpatialIndex` of `roads`. It is built once, and kept on the roads for the next calls'''
+    if getattr(roads, '_spatial_index', None) is None:
+        roads._spatial_index = SpatialIndex(roads)
+    return roads._spatial_index
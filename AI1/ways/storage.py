@@ -0,0 +1,214 @@
+'''
+ A binary cache for the road map.
+ The first load of a CSV parses it into a `CompactRoads` and saves the arrays
+ next to it, in a directory of .npy files. Later loads read the arrays back,
+ as long as the CSV did not change since.
+ The arrays can also be memory-mapped instead of read, so that worker
+ processes that open the same cache share its pages instead of each
+ holding a copy of the map.
+'''
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+from .compact import CompactRoads, load_compact_map_from_csv
+from .algorithms import strongly_connected_components
+from . import tools
+
+'Bump when the layout of the cache changes, to invalidate the existing caches'
+FORMAT_VERSION = 3
+
+'The strongly connected components of the map, saved with its arrays when they were labeled'
+SCC_ARRAYS = ('scc_labels', 'scc_flags', 'wcc_labels')
+
+META_FILE = 'meta.json'
+
+
+def cache_path(filename, start=0, count=sys.maxsize):
+    '''returns the directory in which the cache of this part of the CSV is kept'''
+    if (start, count) == (0, sys.maxsize):
+        return filename + '.roads'
+    return '{}.{}-{}.roads'.format(filename, start, count)
+
+
+def _file_sha1(filename):
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def _source_stamp(filename):
+    stat = os.stat(filename)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _save_arrays(arrays, path, meta):
+    'Saves a dict of arrays as a cache directory. This function is for local use only'
+    meta = dict(meta or {}, version=FORMAT_VERSION, arrays=list(arrays))
+
+    tmp_path = '{}.tmp{}'.format(path, os.getpid())
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, values in arrays.items():
+        np.save(os.path.join(tmp_path, name + '.npy'), values)
+    with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp_path, path)
+
+
+def save_compact_map(roads, path, meta=None):
+    '''saves the arrays of `roads` in the directory `path`.
+    The directory is replaced atomically, so a reader never sees half a cache.'''
+    names = CompactRoads.ARRAYS + (SCC_ARRAYS if roads.scc_labels is not None else ())
+    _save_arrays({name: getattr(roads, name) for name in names}, path, meta)
+
+
+def read_meta(path):
+    '''returns the metadata of the cache in `path`, or None if there is no readable cache there'''
+    try:
+        with open(os.path.join(path, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_compact_map(path, mmap=False):
+    '''loads a `CompactRoads` saved by save_compact_map.
+    With mmap=True the arrays are mapped read-only from disk instead of read,
+    and pickling the roads (e.g. to send them to a worker process) only sends `path`.'''
+    meta = read_meta(path)
+    if meta is None or meta.get('version') != FORMAT_VERSION:
+        raise ValueError('{} is not a version {} map cache'.format(path, FORMAT_VERSION))
+    mmap_mode = 'r' if mmap else None
+    roads = CompactRoads(*[np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+                           for name in CompactRoads.ARRAYS])
+    if all(name in meta['arrays'] for name in SCC_ARRAYS):
+        roads.scc_labels, roads.scc_flags, roads.wcc_labels = \
+            [np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode) for name in SCC_ARRAYS]
+    if mmap:
+        roads.mapped_path = path
+    return roads
+
+
+def is_cache_valid(filename, path):
+    '''checks that the cache in `path` was built from the current contents of `filename`.
+    The size and modification time are compared first; when only the modification time
+    changed, the content hash decides (and the cache is re-stamped if it still matches).'''
+    meta = read_meta(path)
+    if meta is None or meta.get('version') != FORMAT_VERSION:
+        return False
+
+    stamp = _source_stamp(filename)
+    source = meta['source']
+    if stamp['size'] != source['size']:
+        return False
+    if stamp['mtime_ns'] == source['mtime_ns']:
+        return True
+    if _file_sha1(filename) != source['sha1']:
+        return False
+
+    meta['source'].update(stamp)
+    with open(os.path.join(path, META_FILE), 'w') as f:
+        json.dump(meta, f)
+    return True
+
+
+def convert_map(filename, start=0, count=sys.maxsize):
+    '''parses the CSV, labels its strongly connected components and (re)writes its cache.
+    Returns the parsed `CompactRoads`'''
+    source = dict(_source_stamp(filename), sha1=_file_sha1(filename))
+    roads = load_compact_map_from_csv(filename, start, count)
+    strongly_connected_components(roads)
+    save_compact_map(roads, cache_path(filename, start, count), {'source': source, 'start': start, 'count': count})
+    return roads
+
+
+@tools.timed
+def load_cached_map(filename, start=0, count=sys.maxsize, mmap=False):
+    '''returns the graph as `CompactRoads`, like load_compact_map_from_csv,
+    but reads it from the binary cache when there is an up to date one,
+    and creates the cache otherwise.
+    With mmap=True the cache is memory-mapped (see load_compact_map).
+    example: roads = load_cached_map(Consts.getDataFilePath("israel.csv"), mmap=True)
+    '''
+    path = cache_path(filename, start, count)
+    if not is_cache_valid(filename, path):
+        roads = convert_map(filename, start, count)
+        if not mmap:
+            return roads
+    return load_compact_map(path, mmap)
+
+
+'''The arrays of the row index of a CSV. The first five are per row, sorted by latitude;
+id_rows lists the rows by junction index, and sorted_ids is ids[id_rows]'''
+ROW_ARRAYS = ('lat', 'lon', 'ids', 'byte_offsets', 'byte_lengths', 'id_rows', 'sorted_ids')
+
+
+def row_index_path(filename):
+    '''returns the directory in which the row index of the CSV is kept'''
+    return filename + '.rows'
+
+
+def build_row_index(filename):
+    '''reads the junction index, coordinates and position in the file of every row of the CSV
+    (without parsing the links) and saves them next to it. Returns the arrays as a dict'''
+    source = dict(_source_stamp(filename), sha1=_file_sha1(filename))
+    ids, lat, lon, byte_offsets, byte_lengths = [], [], [], [], []
+    position = 0
+    with open(filename, 'rb') as f:
+        for line in f:
+            fields = line.split(b',', 3)
+            if len(fields) >= 3:
+                ids.append(int(fields[0]))
+                lat.append(float(fields[1]))
+                lon.append(float(fields[2]))
+                byte_offsets.append(position)
+                byte_lengths.append(len(line))
+            position += len(line)
+
+    lat = np.array(lat, dtype=np.float64)
+    by_lat = np.argsort(lat, kind='stable')
+    arrays = {'lat': lat[by_lat], 'lon': np.array(lon, dtype=np.float64)[by_lat],
+              'ids': np.array(ids, dtype=np.int64)[by_lat],
+              'byte_offsets': np.array(byte_offsets, dtype=np.int64)[by_lat],
+              'byte_lengths': np.array(byte_lengths, dtype=np.int64)[by_lat]}
+    arrays['id_rows'] = np.argsort(arrays['ids'], kind='stable')
+    arrays['sorted_ids'] = arrays['ids'][arrays['id_rows']]
+    _save_arrays(arrays, row_index_path(filename), {'source': source})
+    return arrays
+
+
+def load_row_index(filename):
+    '''returns the row index of the CSV (see ROW_ARRAYS), reading it from its cache
+    when there is an up to date one, and building it otherwise'''
+    path = row_index_path(filename)
+    if not is_cache_valid(filename, path):
+        return build_row_index(filename)
+    return {name: np.load(os.path.join(path, name + '.npy')) for name in ROW_ARRAYS}
+
+
+'The roads of the current worker process, see init_worker'
+_worker_roads = None
+
+
+def init_worker(roads):
+    '''initializer for a worker pool, e.g.
+    ProcessPoolExecutor(initializer=init_worker, initargs=(roads,))
+    Memory-mapped roads reach the worker as a path and are mapped again there,
+    so all the workers share the same physical pages.'''
+    global _worker_roads
+    _worker_roads = roads
+
+
+def worker_roads():
+    '''returns the roads given to init_worker in this process'''
+    return _worker_roads
@@ -4,6 +4,7 @@ from time import clock
 import zlib
 from math import acos, radians, pi
 from numpy import ones, cos, array, sin
+import numpy as np
 
 'General tools'
 
@@ -69,6 +70,48 @@ def base_traffic_pattern():
     return list(base_pattern)
 
 
+def dhash_ints(values):
+    '''dhash(v) for every int v in an array (of at most 18 digits), bit-identical to the scalar dhash.
+    adler32 of the characters of "(v,)" is computed directly from the digits of v:
+    in a string of length L, the character at (1-based) position i adds c to A and (L - i + 1) * c to B'''
+    values = np.asarray(values, dtype=np.int64)
+    negative = values < 0
+    magnitudes = np.abs(values)
+
+    # A and B without the digits: '(' at the start, then '-' if negative, and ',)' at the end
+    digits_num = np.ones(values.shape, dtype=np.int64)
+    rest = magnitudes // 10
+    while np.any(rest):
+        digits_num += rest > 0
+        rest //= 10
+    length = digits_num + 3 + negative
+    a = 1 + ord('(') + ord(',') + ord(')') + negative * ord('-')
+    b = length + ord('(') * length + negative * ord('-') * (length - 1) + 2 * ord(',') + ord(')')
+
+    # The k-th digit from the end is at distance k + 2 from the end of the string
+    rest = magnitudes.copy()
+    for k in range(int(digits_num.max(initial=1))):
+        present = k < digits_num
+        c = np.where(present, ord('0') + rest % 10, 0)
+        a = a + c
+        b = b + (k + 3) * c
+        rest //= 10
+
+    adler = ((b % 65521) << 16) | (a % 65521)
+    # (adler * 100 * SEED) % 0xffffffff, without overflowing 64 bits
+    return (((adler * 100) % 0xffffffff).astype(np.uint64) * np.uint64(SEED % 0xffffffff)) % np.uint64(0xffffffff)
+
+
+def generate_traffic_noise_params_array(seeds1, seeds2):
+    '''generate_traffic_noise_params for arrays of seeds, in one vectorized pass.
+    Returns two arrays (cos and sin wavelengths), bit-identical to the scalar version'''
+    seeds1 = np.asarray(seeds1, dtype=np.int64)
+    seeds2 = np.asarray(seeds2, dtype=np.int64)
+    wavelength_cos = 60 + 20 * (dhash_ints(seeds1 + seeds2) / 0xffffffff) - 10
+    wavelength_sin = 60 + 20 * (dhash_ints(seeds1 * seeds2) / 0xffffffff) - 10
+    return wavelength_cos, wavelength_sin
+
+
 def generate_traffic_noise_params(seed1, seed2):
     ''' generates some parameters for the traffic noise
     It should look random, and it is symmetrical
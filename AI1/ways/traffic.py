@@ -0,0 +1,126 @@
+'''
+ Time-dependent speeds and travel times.
+ The speed of a link at minute t (of a day that starts at t=0) is the free
+ speed of its road type, divided by the base traffic pattern of the minute and
+ by the traffic noise of the link, and at least the minimal speed of its road type.
+ The noise comes from the cos/sin wavelengths in Link_traffic_params, and only
+ slows a link down (by up to info.TRAFFIC_NOISE_AMPLITUDE), so the free speed
+ is always an upper bound.
+ Speeds are constant within a minute, and a link is traversed by integrating
+ its speed over the minutes it takes. That keeps the travel times FIFO: leaving
+ later never means arriving earlier.
+'''
+
+from math import cos, sin, floor, pi
+import time
+
+import numpy as np
+
+from . import info, tools
+
+MINUTES_PER_DAY = 24 * 60
+
+'km/h to meters per minute'
+KMH_TO_METERS_PER_MINUTE = 1000 / 60
+
+
+def link_speed_at(link, minute, base_traffic):
+    '''the speed of `link` (in km/h) at `minute` (accepts non-integers)'''
+    min_speed, max_speed = info.SPEED_RANGES[link.highway_type]
+    m = floor(minute)
+    noise = 1 + info.TRAFFIC_NOISE_AMPLITUDE * (2 + cos(2 * pi * m / link.link_params.cos_frequency)
+                                                + sin(2 * pi * m / link.link_params.sin_frequency)) / 4
+    return max(min_speed, max_speed / (base_traffic[int(m) % MINUTES_PER_DAY] * noise))
+
+
+def generation_minute(generation):
+    '''the minute of the day a generation of the roads is a snapshot of'''
+    return tools.dhash(generation) % MINUTES_PER_DAY
+
+
+def current_minute():
+    '''the minute of the day now, in local time'''
+    now = time.localtime()
+    return now.tm_hour * 60 + now.tm_min + now.tm_sec / 60
+
+
+class TravelTimes:
+    '''Vectorized speeds and travel times over the links of a `CompactRoads`.
+    Links are addressed by their position in the link arrays of the roads.
+    A link's speed profile is kept as its free and minimal speeds and its two noise
+    frequencies (the base pattern is shared), instead of a speed per minute.'''
+
+    def __init__(self, roads):
+        from .compact import as_compact
+        self.roads = as_compact(roads)
+
+        ranges = np.array(info.SPEED_RANGES, dtype=np.float64)[self.roads.highway_types.astype(np.intp)]
+        self.min_speeds = ranges[:, 0]
+        self.max_speeds = ranges[:, 1]
+        self.cos_omegas = 2 * pi / self.roads.cos_frequencies
+        self.sin_omegas = 2 * pi / self.roads.sin_frequencies
+        self.base_traffic = np.asarray(self.roads.base_traffic, dtype=np.float64)
+        self.distances = self.roads.distances.astype(np.float64)
+
+    def links_from(self, idx):
+        '''the ids of the links leaving junction `idx`'''
+        pos = self.roads.position(idx)
+        return np.arange(self.roads.offsets[pos], self.roads.offsets[pos + 1])
+
+    def link_id(self, source, target):
+        '''the id of the link from junction `source` to junction `target` (the first one, if there are several)'''
+        ids = self.links_from(source)
+        matches = ids[self.roads.target_positions[ids] == self.roads.position(target)]
+        if len(matches) == 0:
+            raise ValueError('no link from {} to {}'.format(source, target))
+        return int(matches[0])
+
+    def speeds(self, link_ids, minutes):
+        '''the speeds (in km/h) of the links at the given minutes (broadcast together)'''
+        link_ids = np.asarray(link_ids, dtype=np.intp)
+        m = np.floor(minutes)
+        noise = 1 + info.TRAFFIC_NOISE_AMPLITUDE * (2 + np.cos(m * self.cos_omegas[link_ids])
+                                                    + np.sin(m * self.sin_omegas[link_ids])) / 4
+        base = self.base_traffic[m.astype(np.intp) % MINUTES_PER_DAY]
+        return np.maximum(self.min_speeds[link_ids], self.max_speeds[link_ids] / (base * noise))
+
+    def travel_time(self, link_ids, departure_minute):
+        '''the minutes it takes to traverse the links, leaving at departure_minute
+        (a number, or an array broadcast with link_ids)'''
+        link_ids, departures = np.broadcast_arrays(np.asarray(link_ids, dtype=np.intp),
+                                                   np.asarray(departure_minute, dtype=np.float64))
+        shape = link_ids.shape
+        link_ids, departures = link_ids.ravel(), departures.ravel()
+
+        remaining = self.distances[link_ids]
+        arrivals = departures.copy()
+        active = np.arange(len(link_ids))
+
+        # Advance all the links that are still on their way by one minute (or to their end) at a time
+        while len(active) > 0:
+            now = arrivals[active]
+            speeds = self.speeds(link_ids[active], now) * KMH_TO_METERS_PER_MINUTE
+            minute_end = np.floor(now) + 1
+            reach = speeds * (minute_end - now)
+
+            done = reach >= remaining[active]
+            finished = active[done]
+            arrivals[finished] = now[done] + remaining[finished] / speeds[done]
+
+            active = active[~done]
+            remaining[active] -= reach[~done]
+            arrivals[active] = minute_end[~done]
+
+        return (arrivals - departures).reshape(shape)
+
+    def free_travel_time(self, link_ids):
+        '''the minutes it takes to traverse the links at their free speed (a lower bound at any time)'''
+        link_ids = np.asarray(link_ids, dtype=np.intp)
+        return self.distances[link_ids] / (self.max_speeds[link_ids] * KMH_TO_METERS_PER_MINUTE)
+
+
+def travel_times(roads):
+    '''returns the `TravelTimes` of `roads`. It is built once, and kept on the roads for the next calls'''
+    if getattr(roads, '_travel_times', None) is None:
+        roads._travel_times = TravelTimes(roads)
+    return roads._travel_times